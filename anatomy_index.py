@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# /// script
+# requires-python = ">=3.9"
+# dependencies = []
+# ///
+"""
+Pre-split the anatomy SVGs into a base layer and a per-muscle overlay index.
+
+For every view this writes:
+    <view>-base.svg         the minified anatomy, every muscle drawn inactive
+    muscle-overlays.json    per view and slug: group id and bounding box
+
+Each muscle is a ``<g id="<slug>">`` in the base layer, so the index carries no
+geometry. A client draws the base layer once, highlights a muscle by styling
+its group by id and can zoom or place labels from the bounding box, without
+walking the full document.
+
+Building also validates that every SVG slug the data refers to
+(``muscle_to_svg_id`` in the config, the ``muscleMapping.ts`` fallback and
+``muscles_mapped_pruned.csv``) exists in at least one view, and exits non-zero
+when one does not.
+
+    uv run anatomy_index.py build
+    uv run anatomy_index.py check     # validation only
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+from exercise_data import CONFIG_JSON, MUSCLES_PRUNED_CSV, ROOT, load_csv_rows, load_svg_groups
+from render_muscle_svgs import INACTIVE_OPACITY, SVG_DIR, VIEWS, SvgTemplate
+
+OUTPUT_DIR = ROOT / "muscle-map" / "public" / "assets" / "anatomy"
+INDEX_NAME = "muscle-overlays.json"
+MUSCLE_MAPPING_TS = ROOT / "muscle-map" / "src" / "utils" / "muscleMapping.ts"
+
+INDEX_VERSION = 2
+
+_PATH_TOKEN_RE = re.compile(r"[MmLlHhVvCcSsQqTtAaZz]|-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_TS_MAPPING_RE = re.compile(r'"([^"]+)"\s*:\s*"([^"]+)"')
+# Number of arguments per path command
+_ARITY = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7, "Z": 0}
+
+
+def _cubic_extrema(p0: float, p1: float, p2: float, p3: float) -> list:
+    """Values of a cubic Bezier coordinate at its endpoints and interior extrema"""
+    values = [p0, p3]
+    a = -p0 + 3 * p1 - 3 * p2 + p3
+    b = 2 * (p0 - 2 * p1 + p2)
+    c = p1 - p0
+    if abs(a) < 1e-12:
+        roots = [-c / b] if abs(b) > 1e-12 else []
+    else:
+        disc = b * b - 4 * a * c
+        roots = [] if disc < 0 else [(-b + s * disc ** 0.5) / (2 * a) for s in (1, -1)]
+    for t in roots:
+        if 0 < t < 1:
+            mt = 1 - t
+            values.append(mt ** 3 * p0 + 3 * mt ** 2 * t * p1 + 3 * mt * t ** 2 * p2 + t ** 3 * p3)
+    return values
+
+
+def path_bbox(d: str) -> tuple:
+    """
+    (min_x, min_y, max_x, max_y) of a path. Cubic and quadratic curves are exact;
+    arcs only contribute their endpoints (the anatomy SVGs use none).
+    """
+    tokens = _PATH_TOKEN_RE.findall(d)
+    xs, ys = [], []
+    x = y = start_x = start_y = 0.0
+    last_control = None
+    i = 0
+    command = None
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            command = tokens[i]
+            i += 1
+            if command in "Zz":
+                x, y = start_x, start_y
+                last_control = None
+                continue
+        if command is None:
+            raise ValueError(f"Path data does not start with a command: {d[:40]!r}")
+        upper = command.upper()
+        args = [float(t) for t in tokens[i:i + _ARITY[upper]]]
+        i += _ARITY[upper]
+        relative = command.islower()
+        ox, oy = (x, y) if relative else (0.0, 0.0)
+
+        if upper == "H":
+            x = args[0] + (x if relative else 0.0)
+        elif upper == "V":
+            y = args[0] + (y if relative else 0.0)
+        elif upper in ("M", "L", "T", "A"):
+            end_x, end_y = args[-2] + ox, args[-1] + oy
+            if upper == "T":
+                cx, cy = (2 * x - last_control[0], 2 * y - last_control[1]) if last_control else (x, y)
+                last_control = (cx, cy)
+                xs.extend(_cubic_extrema(x, x + 2 / 3 * (cx - x), end_x + 2 / 3 * (cx - end_x), end_x))
+                ys.extend(_cubic_extrema(y, y + 2 / 3 * (cy - y), end_y + 2 / 3 * (cy - end_y), end_y))
+            x, y = end_x, end_y
+            if upper == "M":
+                start_x, start_y = x, y
+                # Further coordinate pairs after a moveto are implicit linetos
+                command = "l" if relative else "L"
+        else:
+            if upper == "C":
+                c1 = (args[0] + ox, args[1] + oy)
+                c2 = (args[2] + ox, args[3] + oy)
+            elif upper == "S":
+                c1 = (2 * x - last_control[0], 2 * y - last_control[1]) if last_control else (x, y)
+                c2 = (args[0] + ox, args[1] + oy)
+            else:  # Q, raised to a cubic
+                q = (args[0] + ox, args[1] + oy)
+                end = (args[2] + ox, args[3] + oy)
+                c1 = (x + 2 / 3 * (q[0] - x), y + 2 / 3 * (q[1] - y))
+                c2 = (end[0] + 2 / 3 * (q[0] - end[0]), end[1] + 2 / 3 * (q[1] - end[1]))
+            end_x, end_y = args[-2] + ox, args[-1] + oy
+            xs.extend(_cubic_extrema(x, c1[0], c2[0], end_x))
+            ys.extend(_cubic_extrema(y, c1[1], c2[1], end_y))
+            last_control = q if upper == "Q" else c2
+            x, y = end_x, end_y
+        if upper not in ("C", "S", "Q", "T"):
+            last_control = None
+        xs.append(x)
+        ys.append(y)
+    if not xs:
+        raise ValueError("Empty path data")
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def union_bbox(boxes) -> list:
+    """[x, y, width, height] covering all (min_x, min_y, max_x, max_y) boxes"""
+    boxes = list(boxes)
+    min_x = min(b[0] for b in boxes)
+    min_y = min(b[1] for b in boxes)
+    max_x = max(b[2] for b in boxes)
+    max_y = max(b[3] for b in boxes)
+    return [round(min_x, 2), round(min_y, 2), round(max_x - min_x, 2), round(max_y - min_y, 2)]
+
+
+def build_view(template: SvgTemplate, svg_ids: dict) -> dict:
+    """
+    Overlay entries for one view: slug -> {id, bbox}. The slug is also the id of
+    the muscle's group in the base layer; ``id`` is the svg_muscle_groups.csv id,
+    None for groups the data maps to that are not listed there.
+    """
+    muscles = {}
+    for slug, group in template.index.items():
+        paths = [p.get("d") for p in group.iter() if p.tag.rsplit("}", 1)[-1] == "path" and p.get("d")]
+        if not paths:
+            continue
+        muscles[slug] = {
+            "id": svg_ids.get(slug),
+            "bbox": union_bbox(path_bbox(d) for d in paths),
+        }
+    return muscles
+
+
+def root_attributes(template: SvgTemplate) -> dict:
+    """width/height/viewBox of the template's root element"""
+    attrs = dict(re.findall(r'(\w+)="([^"]*)"', template.head))
+    return {key: attrs[key] for key in ("width", "height", "viewBox") if key in attrs}
+
+
+def load_templates() -> dict:
+    """
+    Both views indexed by every svg_muscle_groups.csv slug plus the slugs the
+    mappings point at, so finer groups such as triceps_brachii_long_head count too
+    """
+    slugs = set(load_svg_groups())
+    for mapping in referenced_slugs().values():
+        slugs.update(mapping.values())
+    return {view: SvgTemplate(SVG_DIR / f"{view}-body-muscles.svg", slugs) for view in VIEWS}
+
+
+def load_ts_muscle_mapping(path: Path = MUSCLE_MAPPING_TS) -> dict:
+    """Hardcoded muscle name -> SVG slug fallback of the viewer (``muscleNameToId``)"""
+    if not Path(path).exists():
+        return {}
+    return dict(_TS_MAPPING_RE.findall(Path(path).read_text(encoding="utf-8")))
+
+
+def referenced_slugs(config_path: Path = CONFIG_JSON) -> dict:
+    """Source name -> {muscle name: SVG slug} for every place that maps muscles to SVG groups"""
+    with Path(config_path).open("r", encoding="utf-8") as f:
+        config = json.load(f)
+    sources = {"config_generated.json muscle_to_svg_id": dict(config.get("muscle_to_svg_id", {}))}
+    if MUSCLE_MAPPING_TS.exists():
+        sources["muscleMapping.ts"] = load_ts_muscle_mapping()
+    sources["muscles_mapped_pruned.csv"] = {
+        row["muscle"]: row["svg_muscle_group"] for row in load_csv_rows(MUSCLES_PRUNED_CSV) if row["svg_muscle_group"]
+    }
+    return sources
+
+
+def validate(templates: dict = None) -> dict:
+    """
+    Cross-check SVG slugs. ``missing`` lists mapped muscles whose slug is in no
+    view (errors); ``unused`` lists svg_muscle_groups.csv slugs absent from both
+    SVGs (warnings).
+    """
+    templates = templates or load_templates()
+    present = set()
+    for template in templates.values():
+        present.update(template.index)
+    missing = []
+    for source, mapping in referenced_slugs().items():
+        for muscle, slug in sorted(mapping.items()):
+            if slug not in present:
+                missing.append({"source": source, "muscle": muscle, "slug": slug})
+    unused = sorted(set(load_svg_groups()) - present)
+    return {"missing": missing, "unused": unused}
+
+
+def print_report(report: dict):
+    for item in report["missing"]:
+        print(f"ERROR {item['source']}: {item['muscle']!r} -> {item['slug']!r} is not in any anatomy SVG")
+    for slug in report["unused"]:
+        print(f"WARNING svg_muscle_groups.csv: {slug!r} is not in any anatomy SVG")
+    if not report["missing"] and not report["unused"]:
+        print("All SVG slugs resolve")
+
+
+def build(output_dir: Path = OUTPUT_DIR, config_path: Path = CONFIG_JSON) -> dict:
+    """Write the base layers and overlay index; returns the validation report"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with Path(config_path).open("r", encoding="utf-8") as f:
+        colors = json.load(f)["muscle_colors"]
+    inactive = f"fill:{colors['inactive']};opacity:{INACTIVE_OPACITY}"
+    svg_ids = load_svg_groups()
+
+    templates = load_templates()
+    index = {"version": INDEX_VERSION, "views": {}}
+    for view, template in templates.items():
+        base_name = f"{view}-base.svg"
+        (output_dir / base_name).write_text(template.render({}, inactive), encoding="utf-8")
+        index["views"][view] = {"base": base_name, **root_attributes(template), "muscles": build_view(template, svg_ids)}
+
+    (output_dir / INDEX_NAME).write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+    return validate(templates)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Split the anatomy SVGs into a base layer and muscle overlays")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Write base layers and the overlay index")
+    build_parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+
+    check_parser = subparsers.add_parser("check", help="Validate SVG slugs referenced by the data")
+    check_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        report = build(args.output_dir)
+        for name in sorted(p.name for p in args.output_dir.iterdir()):
+            print(f"{name:24s} {(args.output_dir / name).stat().st_size / 1024:8.1f} KB")
+        print_report(report)
+        return 1 if report["missing"] else 0
+
+    report = validate()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 1 if report["missing"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
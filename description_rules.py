@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# /// script
+# requires-python = ">=3.9"
+# dependencies = []
+# ///
+"""
+Exercise description extraction rules, shared by the scraper and offline tuning.
+
+A rule set decides which ``<p>`` texts of an exercise page are instructions:
+skip phrases (video player and dialog chrome) and keep keywords (action words).
+Each list is compiled once into a regex that runs on the lowercased paragraph.
+That keeps a rule set to one definition, at about the cost of the original
+``any`` substring loop (``bench`` times both). The joined description can be
+cut at the last sentence end that fits ``max_length`` instead of mid-word.
+
+Rule sets are versioned in ``RULE_SETS``. Version 1 reproduces the original
+scraper heuristics exactly (substring keywords, hard cut at 1,000 characters).
+Version 2 keeps those keywords and only adds sentence truncation. Version 3
+matches keywords at word starts, which also drops real instructions ("position"
+no longer matches "midposition"), so it is not the default. The scraper uses
+``CURRENT_VERSION``, and changing it documents a heuristic change.
+
+The same rules run live (the scraper passes the page's paragraph texts, read
+with one ``all_inner_texts`` call) and offline against stored page HTML
+(``SAVE_PAGE_HTML`` in the scraper):
+
+    uv run description_rules.py extract exercise_pages --output descriptions.csv
+    uv run description_rules.py compare exercise_pages --old 1 --new 3
+    uv run description_rules.py bench [exercise_pages]
+"""
+
+import argparse
+import csv
+import re
+import sys
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+
+from exercise_data import load_exercises
+
+HTML_DIR = Path("exercise_pages")
+
+_WHITESPACE = re.compile(r"\s+")
+# End of a sentence: terminal punctuation, optional closing quote/bracket, then whitespace
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]?(?=\s)")
+
+
+def clean(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip() if text else ""
+
+
+def truncate_sentences(text: str, max_length: int) -> str:
+    """
+    ``text`` cut to at most ``max_length`` characters at a sentence end. Falls back
+    to the last word boundary when the first sentence alone is too long.
+    """
+    if len(text) <= max_length:
+        return text
+    head = text[:max_length + 1]
+    cut = 0
+    for match in _SENTENCE_END.finditer(head):
+        cut = match.end()
+    if not cut:
+        cut = head.rfind(" ")
+        if cut <= 0:
+            cut = max_length
+    return text[:cut].rstrip()
+
+
+class RuleSet:
+    """One versioned set of description heuristics, compiled once"""
+
+    def __init__(self, version: int, skip_phrases, keep_keywords, min_length: int = 21,
+                 max_length: int = 1000, word_boundaries: bool = True, sentence_truncation: bool = True,
+                 ignore=("‎",)):
+        self.version = version
+        self.skip_phrases = tuple(skip_phrases)
+        self.keep_keywords = tuple(keep_keywords)
+        self.min_length = min_length
+        self.max_length = max_length
+        self.sentence_truncation = sentence_truncation
+        self.ignore = frozenset(ignore)
+
+        # Longest alternatives first so the regex engine does not stop at a shorter prefix.
+        # Patterns run on lowercased text: re.IGNORECASE makes every scan several times slower.
+        prefix = r"\b" if word_boundaries else ""
+        keep = "|".join(re.escape(k.lower()) for k in sorted(self.keep_keywords, key=len, reverse=True))
+        skip = "|".join(re.escape(k.lower()) for k in sorted(self.skip_phrases, key=len, reverse=True))
+        self.keep_re = re.compile(f"{prefix}(?:{keep})")
+        self.skip_re = re.compile(f"(?:{skip})")
+
+    def keep(self, text: str, title: str) -> bool:
+        if len(text) < self.min_length or text == title or text in self.ignore:
+            return False
+        lower = text.lower()
+        return not self.skip_re.search(lower) and self.keep_re.search(lower) is not None
+
+    def extract(self, paragraphs, title: str) -> str:
+        """Description from the raw paragraph texts of one exercise page"""
+        parts = [text for text in map(clean, paragraphs) if self.keep(text, title)]
+        description = " ".join(parts)
+        if self.sentence_truncation:
+            return truncate_sentences(description, self.max_length)
+        return description[:self.max_length]
+
+
+_V1_SKIP = (
+    "beginning of dialog window", "escape will cancel", "close the window",
+    "this is a modal window", "video player is loading",
+)
+_V1_KEEP = (
+    "sit on", "stand", "lie", "hold", "grip", "start with",
+    "press", "push", "pull", "lower", "raise", "lift",
+    "position", "arms", "legs", "chest", "back", "repeat",
+    "slowly", "control", "incline", "targets", "emphasis",
+)
+
+RULE_SETS = {
+    # Original scraper heuristics: substring keywords ("lie" matched "earlier"), hard cut
+    1: RuleSet(1, _V1_SKIP, _V1_KEEP, word_boundaries=False, sentence_truncation=False),
+    # Same paragraphs as v1, truncation at sentence boundaries
+    2: RuleSet(2, _V1_SKIP, _V1_KEEP, word_boundaries=False),
+    # Keywords match at word starts ("stand" still matches "standing"), lying/kneel/
+    # step/bend/rotate/squat added. Empties some descriptions v1 keeps: "midposition"
+    # no longer matches "position" (Hammer Curls, Row (T Bar), Triceps Extension - Overhead)
+    3: RuleSet(3, _V1_SKIP + ("no compatible source", "media could not be loaded"),
+               _V1_KEEP + ("lying", "kneel", "step", "bend", "rotat", "squat", "extend", "exhale",
+                           "inhale", "place", "bring", "return")),
+}
+CURRENT_VERSION = 2
+
+
+def get_rules(version: int = None) -> RuleSet:
+    try:
+        return RULE_SETS[version or CURRENT_VERSION]
+    except KeyError:
+        raise ValueError(f"Unknown description rules version {version}, expected one of {sorted(RULE_SETS)}")
+
+
+def extract_description(paragraphs, title: str, version: int = None) -> str:
+    return get_rules(version).extract(paragraphs, title)
+
+
+class _ParagraphParser(HTMLParser):
+    """Text of every <p> (and the first <h1>) in a saved page, <br> as newline"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs = []
+        self.title = ""
+        self._current = None
+        self._in_h1 = False
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip_depth += 1
+        elif tag == "p":
+            self._flush()
+            self._current = []
+        elif tag == "br" and self._current is not None:
+            self._current.append("\n")
+        elif tag == "h1" and not self.title:
+            self._in_h1 = True
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "p":
+            self._flush()
+        elif tag == "h1":
+            self._in_h1 = False
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._current is not None:
+            self._current.append(data)
+        if self._in_h1:
+            self.title += data
+
+    def _flush(self):
+        if self._current is not None:
+            self.paragraphs.append("".join(self._current))
+            self._current = None
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def parse_page(html: str) -> tuple:
+    """(h1 title, paragraph texts) of a stored exercise page"""
+    parser = _ParagraphParser()
+    parser.feed(html)
+    parser.close()
+    return clean(parser.title), parser.paragraphs
+
+
+def load_pages(html_dir: Path = HTML_DIR) -> list:
+    """(exercise_path, title, paragraphs) for every saved page (``<id>.html`` -> /exercise/<id>)"""
+    pages = []
+    for path in sorted(Path(html_dir).glob("*.html")):
+        title, paragraphs = parse_page(path.read_text(encoding="utf-8"))
+        pages.append((f"/exercise/{path.stem}", title, paragraphs))
+    return pages
+
+
+def load_corpus(html_dir: Path = None) -> list:
+    """
+    Stored pages when ``html_dir`` has any, otherwise the scraped CSV descriptions
+    as single paragraphs (enough to benchmark the rules, not to re-tune them)
+    """
+    if html_dir and Path(html_dir).is_dir():
+        pages = load_pages(html_dir)
+        if pages:
+            return pages
+    return [(e["exercise_path"], e["title"], [e["description"]]) for e in load_exercises()]
+
+
+def compare(pages: list, old: int, new: int) -> dict:
+    """Descriptions that differ between two rule versions, with length and mid-sentence stats"""
+    old_rules, new_rules = get_rules(old), get_rules(new)
+    changed = []
+    stats = {old: {"empty": 0, "mid_sentence": 0, "chars": 0}, new: {"empty": 0, "mid_sentence": 0, "chars": 0}}
+    for exercise_path, title, paragraphs in pages:
+        results = {}
+        for version, rules in ((old, old_rules), (new, new_rules)):
+            description = rules.extract(paragraphs, title)
+            results[version] = description
+            stats[version]["chars"] += len(description)
+            stats[version]["empty"] += not description
+            stats[version]["mid_sentence"] += bool(description) and not description.endswith((".", "!", "?"))
+        if results[old] != results[new]:
+            changed.append({"exercise_path": exercise_path, "title": title, "old": results[old], "new": results[new]})
+    return {"pages": len(pages), "changed": changed, "stats": stats}
+
+
+def legacy_extract(paragraphs, title: str) -> str:
+    """The scraper's original loop: ``any`` substring scan over the lowercased paragraph per phrase list"""
+    parts = []
+    for text in map(clean, paragraphs):
+        if len(text) <= 20 or text == title or text == "‎":
+            continue
+        lower = text.lower()
+        if any(skip in lower for skip in _V1_SKIP):
+            continue
+        if any(keyword in lower for keyword in _V1_KEEP):
+            parts.append(text)
+    return " ".join(parts)[:1000]
+
+
+def benchmark(pages: list, repeat: int = 5):
+    paragraphs = sum(len(p) for _, _, p in pages)
+    print(f"Corpus: {len(pages)} pages, {paragraphs} paragraphs")
+    extractors = [("legacy substring scan", legacy_extract)]
+    extractors += [(f"rules v{version}", rules.extract) for version, rules in sorted(RULE_SETS.items())]
+    for name, extract in extractors:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for _, title, texts in pages:
+                extract(texts, title)
+        elapsed = (time.perf_counter() - started) / repeat
+        print(f"{name:22s} {elapsed * 1000:8.1f} ms for the corpus ({elapsed / max(len(pages), 1) * 1e6:.1f} µs/page)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run and compare description extraction rules")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    extract = sub.add_parser("extract", help="Extract descriptions from stored page HTML")
+    extract.add_argument("html_dir", type=Path, nargs="?", default=HTML_DIR)
+    extract.add_argument("--rules", type=int, default=CURRENT_VERSION)
+    extract.add_argument("--output", type=Path, default=None, help="CSV output (default: print)")
+
+    diff = sub.add_parser("compare", help="Show descriptions that change between two rule versions")
+    diff.add_argument("html_dir", type=Path, nargs="?", default=HTML_DIR)
+    diff.add_argument("--old", type=int, default=1)
+    diff.add_argument("--new", type=int, default=CURRENT_VERSION)
+    diff.add_argument("--limit", type=int, default=10, help="Changed descriptions to print")
+
+    bench = sub.add_parser("bench", help="Time every rule version over the corpus")
+    bench.add_argument("html_dir", type=Path, nargs="?", default=HTML_DIR)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "extract":
+        if not args.html_dir.is_dir():
+            print(f"{args.html_dir} not found, scrape with SAVE_PAGE_HTML = True first", file=sys.stderr)
+            return 1
+        rules = get_rules(args.rules)
+        rows = [{"exercise_path": path, "title": title, "description": rules.extract(paragraphs, title)}
+                for path, title, paragraphs in load_pages(args.html_dir)]
+        if args.output:
+            with args.output.open("w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=["exercise_path", "title", "description"])
+                writer.writeheader()
+                writer.writerows(rows)
+            print(f"Saved {len(rows)} descriptions (rules v{rules.version}) to {args.output}")
+        else:
+            for row in rows:
+                print(f"{row['exercise_path']}  {row['title']}\n    {row['description']}")
+        return 0
+
+    pages = load_corpus(args.html_dir)
+    if args.command == "bench":
+        benchmark(pages)
+        return 0
+
+    result = compare(pages, args.old, args.new)
+    for version in (args.old, args.new):
+        s = result["stats"][version]
+        print(f"v{version}: {s['chars'] / max(result['pages'], 1):6.0f} chars avg, {s['empty']} empty, "
+              f"{s['mid_sentence']} ending mid-sentence")
+    print(f"{len(result['changed'])} of {result['pages']} descriptions change")
+    for item in result["changed"][:args.limit]:
+        print(f"\n{item['title']} ({item['exercise_path']})\n  - {item['old'][-120:]}\n  + {item['new'][-120:]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
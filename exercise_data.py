@@ -0,0 +1,115 @@
+"""
+Shared loaders for the scraped exercise and muscle CSV files.
+
+The exercise CSV is written by ``scrape_muscle_and_motion_v2.py``: it is
+``;``-delimited, starts with a BOM, and stores each muscle role and the
+equipment as a ``"; "``-joined list inside a single field.
+"""
+
+import csv
+import json
+import re
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+EXERCISES_CSV = ROOT / "muscle_and_motion_exercices.csv"
+MUSCLES_MAPPED_CSV = ROOT / "muscles_mapped.csv"
+MUSCLES_PRUNED_CSV = ROOT / "muscles_mapped_pruned.csv"
+SVG_GROUPS_CSV = ROOT / "svg_muscle_groups.csv"
+BROAD_GROUPS_CSV = ROOT / "broad_muscle_groups.csv"
+BROADER_GROUPS_CSV = ROOT / "broader_muscle_groups.csv"
+CONFIG_JSON = ROOT / "muscle-map" / "public" / "config_generated.json"
+# Written by exercise_variants.py
+VARIANTS_CSV = ROOT / "exercise_variants.csv"
+
+# Muscle role columns, in the order they are shown in the viewer
+MUSCLE_ROLES = ("target", "synergist", "stabilizer", "lengthening")
+LIST_SEPARATOR = "; "
+
+
+def split_list(value: str) -> list:
+    """Split a ``"; "``-joined CSV field into a list of stripped, non-empty items"""
+    if not value:
+        return []
+    return [item.strip() for item in value.split(";") if item.strip()]
+
+
+def exercise_slug(title: str) -> str:
+    """
+    Slug used as the exercise key in ``config_generated.json``.
+    Parenthesised variants are dropped: "Bench Press (Barbell)" -> "bench_press".
+    """
+    base = re.sub(r"\s*\([^)]*\)", "", title)
+    return re.sub(r"[^a-z0-9]+", "_", base.lower()).strip("_")
+
+
+def load_exercises(path: Path = EXERCISES_CSV) -> list:
+    """
+    Load the exercise CSV into a list of dicts.
+    Muscle roles are exposed as lists under ``<role>_muscles`` and equipment as a list.
+    """
+    exercises = []
+    with Path(path).open("r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f, delimiter=";")
+        for row in reader:
+            exercise = {
+                "title": row["title"],
+                "exercise_path": row["exercise_path"],
+                "url": row.get("url", ""),
+                "slug": exercise_slug(row["title"]),
+                "description": row.get("description") or "",
+                "equipment": split_list(row.get("equipment") or ""),
+            }
+            for role in MUSCLE_ROLES:
+                exercise[f"{role}_muscles"] = split_list(row.get(f"{role}_muscles") or "")
+            exercises.append(exercise)
+    return exercises
+
+
+def load_csv_rows(path: Path) -> list:
+    """Load a plain comma-delimited CSV (muscle mappings, group lists) as dicts"""
+    with Path(path).open("r", encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def load_svg_groups(path: Path = SVG_GROUPS_CSV) -> dict:
+    """SVG muscle group slug -> numeric id (1-based, as in ``svg_muscle_groups.csv``)"""
+    return {row["slug"]: int(row["id"]) for row in load_csv_rows(path)}
+
+
+def load_muscle_to_svg() -> dict:
+    """
+    Casefolded muscle name -> SVG group slug.
+    Sources in order of precedence: the pruned mapping, the config's
+    ``muscle_to_svg_id`` and the full mapping (which stores numeric SVG ids).
+    Slugs that do not exist in ``svg_muscle_groups.csv`` are ignored.
+    """
+    svg_groups = load_svg_groups()
+    slug_by_id = {svg_id: slug for slug, svg_id in svg_groups.items()}
+    mapping = {}
+
+    for row in load_csv_rows(MUSCLES_PRUNED_CSV):
+        if row["svg_muscle_group"] in svg_groups:
+            mapping.setdefault(row["muscle"].casefold(), row["svg_muscle_group"])
+
+    if CONFIG_JSON.exists():
+        with CONFIG_JSON.open("r", encoding="utf-8") as f:
+            config_mapping = json.load(f).get("muscle_to_svg_id", {})
+        for muscle, slug in config_mapping.items():
+            if slug in svg_groups:
+                mapping.setdefault(muscle.casefold(), slug)
+
+    for row in load_csv_rows(MUSCLES_MAPPED_CSV):
+        svg_id = row["svg_muscle_group"]
+        if svg_id.isdigit() and int(svg_id) in slug_by_id:
+            mapping.setdefault(row["muscle"].casefold(), slug_by_id[int(svg_id)])
+
+    return mapping
+
+
+def load_families(path: Path = VARIANTS_CSV) -> dict:
+    """exercise_path -> variant family id from ``exercise_variants.py``; empty when not built yet"""
+    if not Path(path).exists():
+        return {}
+    return {row["exercise_path"]: row["family_id"] for row in load_csv_rows(path)}
@@ -0,0 +1,384 @@
+#!/usr/bin/env python
+# /// script
+# requires-python = ">=3.9"
+# dependencies = []
+# ///
+"""
+Compact, versioned binary format for the exercise dataset.
+
+The whole dataset (exercises, muscles, role postings and lookup indexes) is
+compiled into one file that readers ``mmap`` and query in place. Opening it
+only parses the fixed-size header; every array is a zero-copy ``memoryview``
+over the mapping and records are decoded on access.
+
+Layout (little-endian, every section 8-byte aligned)::
+
+    header          magic, version, counts, section table
+    strings         u32 offsets[n_strings + 1] + UTF-8 blob
+    exercises       fixed-width records (see EXERCISE_RECORD)
+    muscles         fixed-width records (see MUSCLE_RECORD)
+    equipment       CSR: u32 offsets[n_exercises + 1], u32 string ids
+    forward[role]   CSR: u32 offsets[n_exercises + 1], u16 muscle ids
+    inverted[role]  CSR: u32 offsets[n_muscles + 1], u32 exercise ids
+    path index      open-addressing hash table of u32 (row + 1, 0 = empty)
+    slug index      same, keyed by config slug
+    muscle index    same, keyed by casefolded muscle name
+
+Hash tables use 64-bit FNV-1a so they are stable across processes.
+"""
+
+import argparse
+import mmap
+import struct
+import sys
+import time
+from pathlib import Path
+
+from exercise_data import MUSCLE_ROLES, load_exercises
+from muscle_names import get_canonicalizer
+
+DB_PATH = Path("exercises.wkdb")
+
+MAGIC = b"WKDB"
+VERSION = 1
+NO_STRING = 0xFFFFFFFF
+
+# magic, version, flags, built_at, n_exercises, n_muscles, n_strings, n_sections
+HEADER = struct.Struct("<4sHHQIIII")
+SECTION = struct.Struct("<QQ")  # offset, length
+
+# title, exercise_path, slug, url, description (string ids)
+EXERCISE_RECORD = struct.Struct("<5I")
+EXERCISE_FIELDS = ("title", "exercise_path", "slug", "url", "description")
+
+# name, canonical, svg_muscle_group, broad_muscle_group (string ids, NO_STRING when empty)
+MUSCLE_RECORD = struct.Struct("<4I")
+MUSCLE_FIELDS = ("name", "canonical", "svg_muscle_group", "broad_muscle_group")
+
+SECTION_NAMES = (
+    ["string_offsets", "string_data", "exercises", "muscles", "equipment_offsets", "equipment_ids"]
+    + [f"{role}_{part}" for role in MUSCLE_ROLES for part in ("offsets", "ids")]
+    + [f"{role}_inverted_{part}" for role in MUSCLE_ROLES for part in ("offsets", "ids")]
+    + ["path_index", "slug_index", "muscle_index"]
+)
+
+FNV_OFFSET = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+def fnv1a(data: bytes) -> int:
+    h = FNV_OFFSET
+    for byte in data:
+        h = ((h ^ byte) * FNV_PRIME) & MASK_64
+    return h
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids = {}
+        self.items = []
+
+    def add(self, value) -> int:
+        if not value:
+            return NO_STRING
+        if value not in self.ids:
+            self.ids[value] = len(self.items)
+            self.items.append(value)
+        return self.ids[value]
+
+    def encode(self) -> tuple:
+        offsets = [0]
+        blob = bytearray()
+        for item in self.items:
+            blob += item.encode("utf-8")
+            offsets.append(len(blob))
+        return struct.pack(f"<{len(offsets)}I", *offsets), bytes(blob)
+
+
+def _hash_table(keys: list) -> bytes:
+    """Linear-probing table of (row + 1) keyed by ``keys[row]``; later rows win on duplicates"""
+    capacity = 1
+    while capacity < max(2 * len(keys), 8):
+        capacity <<= 1
+    slots = [0] * capacity
+    slot_keys = [None] * capacity
+    for row, key in enumerate(keys):
+        if not key:
+            continue
+        data = key.encode("utf-8")
+        i = fnv1a(data) & (capacity - 1)
+        while slots[i] and slot_keys[i] != data:
+            i = (i + 1) & (capacity - 1)
+        slots[i] = row + 1
+        slot_keys[i] = data
+    return struct.pack(f"<{capacity}I", *slots)
+
+
+def _csr(lists: list, fmt: str) -> tuple:
+    offsets = [0]
+    values = []
+    for items in lists:
+        values.extend(items)
+        offsets.append(len(values))
+    return struct.pack(f"<{len(offsets)}I", *offsets), struct.pack(f"<{len(values)}{fmt}", *values)
+
+
+def compile_dataset(exercises: list = None) -> bytes:
+    """Compile the exercise CSV (plus canonical muscle data) into the binary format"""
+    exercises = exercises if exercises is not None else load_exercises()
+    muscle_names = get_canonicalizer()
+    strings = _StringTable()
+
+    muscle_ids = {}
+    for exercise in exercises:
+        for role in MUSCLE_ROLES:
+            for muscle in exercise[f"{role}_muscles"]:
+                muscle_ids.setdefault(muscle, len(muscle_ids))
+    if len(muscle_ids) > 0xFFFF:
+        raise ValueError(f"Too many distinct muscles for u16 ids: {len(muscle_ids)}")
+
+    exercise_records = bytearray()
+    for exercise in exercises:
+        exercise_records += EXERCISE_RECORD.pack(*(strings.add(exercise[f]) for f in EXERCISE_FIELDS))
+
+    muscle_records = bytearray()
+    for muscle in muscle_ids:
+        muscle_records += MUSCLE_RECORD.pack(
+            strings.add(muscle),
+            strings.add(muscle_names.canonical(muscle)),
+            strings.add(muscle_names.svg_slug(muscle)),
+            strings.add(muscle_names.broad_group(muscle)),
+        )
+
+    sections = {
+        "exercises": bytes(exercise_records),
+        "muscles": bytes(muscle_records),
+    }
+    sections["equipment_offsets"], sections["equipment_ids"] = _csr(
+        [[strings.add(e) for e in exercise["equipment"]] for exercise in exercises], "I")
+    for role in MUSCLE_ROLES:
+        forward = [[muscle_ids[m] for m in exercise[f"{role}_muscles"]] for exercise in exercises]
+        sections[f"{role}_offsets"], sections[f"{role}_ids"] = _csr(forward, "H")
+        inverted = [[] for _ in muscle_ids]
+        for row, ids in enumerate(forward):
+            for muscle_id in ids:
+                inverted[muscle_id].append(row)
+        sections[f"{role}_inverted_offsets"], sections[f"{role}_inverted_ids"] = _csr(inverted, "I")
+    sections["path_index"] = _hash_table([e["exercise_path"] for e in exercises])
+    sections["slug_index"] = _hash_table([e["slug"] for e in exercises])
+    sections["muscle_index"] = _hash_table([m.casefold() for m in muscle_ids])
+    # Encode strings last, every add() above must have happened already
+    sections["string_offsets"], sections["string_data"] = strings.encode()
+
+    table_size = SECTION.size * len(SECTION_NAMES)
+    offset = _align(HEADER.size + table_size)
+    layout = []
+    for name in SECTION_NAMES:
+        layout.append((offset, len(sections[name])))
+        offset = _align(offset + len(sections[name]))
+
+    out = bytearray(offset)
+    HEADER.pack_into(out, 0, MAGIC, VERSION, 0, int(time.time()), len(exercises),
+                     len(muscle_ids), len(strings.items), len(SECTION_NAMES))
+    for i, (name, (start, length)) in enumerate(zip(SECTION_NAMES, layout)):
+        SECTION.pack_into(out, HEADER.size + i * SECTION.size, start, length)
+        out[start:start + length] = sections[name]
+    return bytes(out)
+
+
+def build(path: Path = DB_PATH, exercises: list = None) -> int:
+    """Compile and write the dataset file, returns its size in bytes"""
+    data = compile_dataset(exercises)
+    tmp = Path(path).with_suffix(".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+    return len(data)
+
+
+class ExerciseDB:
+    """Read-only, memory-mapped view of a compiled dataset file"""
+
+    def __init__(self, path: Path = DB_PATH):
+        if sys.byteorder != "little":
+            raise RuntimeError("ExerciseDB files are little-endian and are read in place")
+        self.path = Path(path)
+        self._file = self.path.open("rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, _, self.built_at, self.n_exercises, self.n_muscles, self.n_strings, n_sections = \
+            HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not an exercise dataset file")
+        if version != VERSION or n_sections != len(SECTION_NAMES):
+            self.close()
+            raise ValueError(f"{self.path} has format version {version}, expected {VERSION}; rebuild it")
+
+        self._sections = {}
+        for i, name in enumerate(SECTION_NAMES):
+            start, length = SECTION.unpack_from(self._mmap, HEADER.size + i * SECTION.size)
+            self._sections[name] = (start, length)
+
+        self._string_offsets = self._array("string_offsets", "I")
+        self._string_data = self._raw("string_data")
+        self._equipment = (self._array("equipment_offsets", "I"), self._array("equipment_ids", "I"))
+        self._forward = {role: (self._array(f"{role}_offsets", "I"), self._array(f"{role}_ids", "H"))
+                         for role in MUSCLE_ROLES}
+        self._inverted = {role: (self._array(f"{role}_inverted_offsets", "I"),
+                                 self._array(f"{role}_inverted_ids", "I"))
+                          for role in MUSCLE_ROLES}
+        self._indexes = {name: self._array(name, "I") for name in ("path_index", "slug_index", "muscle_index")}
+
+    def _raw(self, name: str) -> memoryview:
+        start, length = self._sections[name]
+        return self._view[start:start + length]
+
+    def _array(self, name: str, fmt: str) -> memoryview:
+        return self._raw(name).cast(fmt)
+
+    def close(self):
+        # Drop every view first, the mmap cannot close while buffers are exported
+        for name in [n for n in vars(self) if n.startswith("_") and n not in ("_mmap", "_file")]:
+            delattr(self, name)
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A caller still holds a slice (e.g. from exercises_for_muscle); unmapped on GC
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.n_exercises
+
+    def string(self, string_id: int):
+        if string_id == NO_STRING:
+            return None
+        start, end = self._string_offsets[string_id], self._string_offsets[string_id + 1]
+        return str(self._string_data[start:end], "utf-8")
+
+    def _lookup(self, index: str, key: str, field: int, record: struct.Struct, section: str):
+        table = self._indexes[index]
+        data = key.encode("utf-8")
+        capacity = len(table)
+        i = fnv1a(data) & (capacity - 1)
+        start = self._sections[section][0]
+        while table[i]:
+            row = table[i] - 1
+            string_id = struct.unpack_from("<I", self._mmap, start + row * record.size + field * 4)[0]
+            begin, end = self._string_offsets[string_id], self._string_offsets[string_id + 1]
+            candidate = self._string_data[begin:end]
+            if candidate == data or (index == "muscle_index" and str(candidate, "utf-8").casefold() == key):
+                return row
+            i = (i + 1) & (capacity - 1)
+        return None
+
+    def find_by_path(self, exercise_path: str):
+        """Row of the exercise with this path (e.g. "/exercise/1464"), or None"""
+        return self._lookup("path_index", exercise_path, 1, EXERCISE_RECORD, "exercises")
+
+    def find_by_slug(self, slug: str):
+        """Row of the exercise with this config slug (last one wins, as in the config), or None"""
+        return self._lookup("slug_index", slug, 2, EXERCISE_RECORD, "exercises")
+
+    def find_muscle(self, name: str):
+        """Muscle id for a raw muscle name (case-insensitive), or None"""
+        return self._lookup("muscle_index", name.casefold(), 0, MUSCLE_RECORD, "muscles")
+
+    def exercise(self, row: int, fields=EXERCISE_FIELDS, muscles: bool = True) -> dict:
+        """Decode one exercise record, optionally with its equipment and muscle names"""
+        if not 0 <= row < self.n_exercises:
+            raise IndexError(row)
+        start = self._sections["exercises"][0] + row * EXERCISE_RECORD.size
+        values = EXERCISE_RECORD.unpack_from(self._mmap, start)
+        result = {name: self.string(value) or "" for name, value in zip(EXERCISE_FIELDS, values)
+                  if name in fields}
+        if muscles:
+            offsets, ids = self._equipment
+            result["equipment"] = [self.string(i) for i in ids[offsets[row]:offsets[row + 1]]]
+            for role in MUSCLE_ROLES:
+                result[f"{role}_muscles"] = [self.muscle(m)["name"] for m in self.muscle_ids(row, role)]
+        return result
+
+    def muscle_ids(self, row: int, role: str) -> memoryview:
+        offsets, ids = self._forward[role]
+        return ids[offsets[row]:offsets[row + 1]]
+
+    def exercises_for_muscle(self, muscle_id: int, role: str) -> memoryview:
+        """Rows of exercises that list ``muscle_id`` under ``role`` (sorted ascending)"""
+        offsets, ids = self._inverted[role]
+        return ids[offsets[muscle_id]:offsets[muscle_id + 1]]
+
+    def muscle(self, muscle_id: int) -> dict:
+        if not 0 <= muscle_id < self.n_muscles:
+            raise IndexError(muscle_id)
+        start = self._sections["muscles"][0] + muscle_id * MUSCLE_RECORD.size
+        values = MUSCLE_RECORD.unpack_from(self._mmap, start)
+        return {name: self.string(value) for name, value in zip(MUSCLE_FIELDS, values)}
+
+
+def benchmark(path: Path, repeat: int = 1000):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        ExerciseDB(path).close()
+    open_us = (time.perf_counter() - started) / repeat * 1e6
+
+    with ExerciseDB(path) as db:
+        paths = [db.exercise(row, muscles=False)["exercise_path"] for row in range(len(db))]
+        started = time.perf_counter()
+        for exercise_path in paths:
+            db.exercise(db.find_by_path(exercise_path))
+        lookup_us = (time.perf_counter() - started) / len(paths) * 1e6
+
+    print(f"Open:                   {open_us:8.1f} µs")
+    print(f"Lookup + decode by path: {lookup_us:7.1f} µs")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile and query the binary exercise dataset")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Compile the CSV data into the binary file")
+    get = sub.add_parser("get", help="Look up an exercise by path or slug")
+    get.add_argument("key")
+    sub.add_parser("bench", help="Measure open and lookup times")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        size = build(args.db)
+        print(f"Saved {args.db} ({size / 1024:.0f} KB)")
+        return 0
+
+    if not args.db.exists():
+        print(f"{args.db} not found, run the build command first", file=sys.stderr)
+        return 1
+    if args.command == "bench":
+        benchmark(args.db)
+        return 0
+
+    with ExerciseDB(args.db) as db:
+        row = db.find_by_path(args.key)
+        if row is None:
+            row = db.find_by_slug(args.key)
+        if row is None:
+            print(f"Unknown exercise: {args.key}", file=sys.stderr)
+            return 1
+        exercise = db.exercise(row)
+        for key, value in exercise.items():
+            print(f"{key}: {'; '.join(value) if isinstance(value, list) else value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
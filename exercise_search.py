@@ -0,0 +1,513 @@
+#!/usr/bin/env python
+# /// script
+# requires-python = ">=3.9"
+# dependencies = []
+# ///
+"""
+Full-text search over exercise titles and descriptions.
+
+The index is built once from the exercise CSV and pickled to
+``exercises.search``:
+
+- Text is lowercased, split on non-alphanumerics, stripped of stop words and
+  stemmed with a light suffix stemmer ("raises", "raised", "raising" -> "rais").
+- Adjacent terms are also indexed as bigrams, so "hip hinge" or a quoted
+  phrase ranks exact phrases first, and hyphenated words ("single-arm") are
+  always matched as a phrase.
+- Postings store precomputed BM25 impacts (title terms count ``TITLE_BOOST``
+  times), so a query is a sum of a few arrays.
+- Muscle and equipment filters are int bitsets over exercise rows. A muscle
+  filter matches any spelling the canonicalizer knows, and a name without a
+  head ("Biceps Femoris") matches every head.
+- Title autocomplete matches the last word as a prefix and tolerates one typo
+  per word (deletion neighbourhoods of title words and their prefixes).
+- When ``exercise_variants.csv`` exists at build time, results carry a
+  ``family_id`` and ``collapse=True`` keeps only the best exercise per family.
+
+    uv run exercise_search.py build
+    uv run exercise_search.py search "hip hinge" --muscle "Gluteus Maximus" --equipment Barbell
+    uv run exercise_search.py suggest "benhc pre"
+"""
+
+import argparse
+import hashlib
+import heapq
+import math
+import pickle
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+from exercise_data import EXERCISES_CSV, MUSCLE_ROLES, load_exercises, load_families
+from muscle_names import get_canonicalizer, normalize, split_name
+
+INDEX_PATH = Path("exercises.search")
+INDEX_VERSION = 2
+
+K1 = 1.2
+B = 0.75
+TITLE_BOOST = 3
+# Bigram hits are worth more than their two unigrams alone
+BIGRAM_BOOST = 1.5
+DEFAULT_LIMIT = 10
+# Shortest word (or prefix) that gets typo tolerance
+MIN_TYPO_LENGTH = 4
+
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or so that the then this to
+up was while with you your yours keep make sure do not can will should
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+_QUOTED_RE = re.compile(r'"([^"]+)"')
+_VOWELS = set("aeiouy")
+
+
+def stem(word: str) -> str:
+    """
+    Light English suffix stemmer, enough to conflate plurals and verb forms in
+    exercise instructions ("curls"/"curling", "raises"/"raised"). Digits pass through.
+    """
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    if word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "i"
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    for suffix in ("ingly", "edly", "ing", "ed", "ly"):
+        if word.endswith(suffix) and _VOWELS & set(word[:-len(suffix)]) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            # "squatting" -> "squatt" -> "squat"
+            if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            break
+    if word.endswith("y") and len(word) > 3 and word[-2] not in _VOWELS:
+        word = word[:-1] + "i"
+    if word.endswith("e") and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list:
+    """
+    Lowercased word tokens; a hyphenated word is returned as a tuple of its
+    parts so callers can treat it as a phrase.
+    """
+    tokens = []
+    for match in _TOKEN_RE.findall(text.lower()):
+        tokens.append(tuple(match.split("-")) if "-" in match else match)
+    return tokens
+
+
+def analyze(text: str) -> list:
+    """Stemmed terms without stop words, in order (hyphenated words are flattened)"""
+    terms = []
+    for token in tokenize(text):
+        for word in (token if isinstance(token, tuple) else (token,)):
+            if word not in STOP_WORDS:
+                terms.append(stem(word))
+    return terms
+
+
+def bigrams(terms: list) -> list:
+    return [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+
+
+def deletes(word: str) -> set:
+    """Every string one character deletion away from ``word``"""
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _bits(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _source_hash(path: Path) -> str:
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+
+def compile_index(exercises: list = None, source: Path = EXERCISES_CSV) -> dict:
+    """Build the picklable index structure from the exercise CSV"""
+    if exercises is None:
+        exercises = load_exercises(source)
+
+    families = load_families()
+
+    # Term frequencies per document, title counting TITLE_BOOST times
+    doc_terms = []
+    lengths = []
+    for exercise in exercises:
+        title = analyze(exercise["title"])
+        body = analyze(exercise["description"])
+        counts = {}
+        for terms, weight in ((title, TITLE_BOOST), (body, 1)):
+            for term in terms + bigrams(terms):
+                counts[term] = counts.get(term, 0) + weight
+        doc_terms.append(counts)
+        lengths.append(len(title) * TITLE_BOOST + len(body))
+
+    n_docs = len(exercises)
+    avg_length = sum(lengths) / max(n_docs, 1)
+    by_term = {}
+    for doc, counts in enumerate(doc_terms):
+        for term, tf in counts.items():
+            by_term.setdefault(term, []).append((doc, tf))
+
+    postings = {}
+    for term, entries in by_term.items():
+        idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+        boost = BIGRAM_BOOST if " " in term else 1.0
+        docs = array("H", (doc for doc, _ in entries))
+        impacts = array("f", (
+            boost * idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * lengths[doc] / avg_length))
+            for doc, tf in entries
+        ))
+        postings[term] = (docs.tobytes(), impacts.tobytes())
+
+    # Filters: normalised muscle key (canonical, head-less base and raw spellings)
+    # per role, plus None for any role; equipment by casefolded name
+    muscle_names = get_canonicalizer()
+    muscle_masks = {}
+    equipment_masks = {}
+    for doc, exercise in enumerate(exercises):
+        bit = 1 << doc
+        for role in MUSCLE_ROLES:
+            for muscle in exercise[f"{role}_muscles"]:
+                canonical = muscle_names.canonical(muscle) or muscle
+                keys = {normalize(muscle), normalize(canonical), split_name(canonical)[0]}
+                for key in keys:
+                    for scope in (role, None):
+                        muscle_masks[scope, key] = muscle_masks.get((scope, key), 0) | bit
+        for item in exercise["equipment"]:
+            equipment_masks[item.casefold()] = equipment_masks.get(item.casefold(), 0) | bit
+
+    # Autocomplete: raw title words, their doc bitsets and typo neighbourhoods of
+    # every word and word prefix (length >= MIN_TYPO_LENGTH - 1)
+    title_words = {}
+    for doc, exercise in enumerate(exercises):
+        for token in tokenize(exercise["title"]):
+            for word in (token if isinstance(token, tuple) else (token,)):
+                title_words[word] = title_words.get(word, 0) | (1 << doc)
+    vocabulary = sorted(title_words)
+    typo_words = {}
+    typo_prefixes = {}
+    for word in vocabulary:
+        if len(word) >= MIN_TYPO_LENGTH - 1:
+            for variant in deletes(word):
+                typo_words.setdefault(variant, set()).add(word)
+        for end in range(MIN_TYPO_LENGTH - 1, len(word) + 1):
+            for variant in deletes(word[:end]) | {word[:end]}:
+                typo_prefixes.setdefault(variant, set()).add(word)
+
+    return {
+        "version": INDEX_VERSION,
+        "source": _source_hash(source) if Path(source).exists() else "",
+        "titles": [e["title"] for e in exercises],
+        "slugs": [e["slug"] for e in exercises],
+        "paths": [e["exercise_path"] for e in exercises],
+        "families": [families.get(e["exercise_path"]) for e in exercises],
+        "postings": postings,
+        "muscles": muscle_masks,
+        "equipment": equipment_masks,
+        "vocabulary": vocabulary,
+        "title_words": title_words,
+        "typo_words": {k: tuple(v) for k, v in typo_words.items()},
+        "typo_prefixes": {k: tuple(v) for k, v in typo_prefixes.items()},
+    }
+
+
+def build(path: Path = INDEX_PATH, exercises: list = None) -> int:
+    """Compile and write the index, returns its size in bytes"""
+    data = pickle.dumps(compile_index(exercises), protocol=pickle.HIGHEST_PROTOCOL)
+    Path(path).write_bytes(data)
+    return len(data)
+
+
+class SearchIndex:
+    """Loaded search index; see the module docstring for the query features"""
+
+    def __init__(self, path: Path = INDEX_PATH):
+        with Path(path).open("rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"{path} has index version {data.get('version')}, expected {INDEX_VERSION}")
+        self.path = Path(path)
+        self.source = data["source"]
+        self.titles = data["titles"]
+        self.slugs = data["slugs"]
+        self.paths = data["paths"]
+        self.families = data["families"]
+        self.postings = data["postings"]
+        self.muscles = data["muscles"]
+        self.equipment = data["equipment"]
+        self.vocabulary = data["vocabulary"]
+        self.title_words = data["title_words"]
+        self.typo_words = data["typo_words"]
+        self.typo_prefixes = data["typo_prefixes"]
+        self.all_docs = (1 << len(self.titles)) - 1
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def is_stale(self, source: Path = EXERCISES_CSV) -> bool:
+        return not Path(source).exists() or _source_hash(source) != self.source
+
+    def _result(self, doc: int, score: float = None) -> dict:
+        result = {"title": self.titles[doc], "slug": self.slugs[doc], "exercise_path": self.paths[doc]}
+        if self.families[doc]:
+            result["family_id"] = self.families[doc]
+        if score is not None:
+            result["score"] = round(score, 4)
+        return result
+
+    def muscle_mask(self, muscle: str, role: str = None) -> int:
+        """Bitset of exercises using ``muscle`` (any spelling) in ``role`` or any role"""
+        if role is not None and role not in MUSCLE_ROLES:
+            raise ValueError(f"role must be one of {', '.join(MUSCLE_ROLES)}")
+        key = normalize(muscle)
+        if (role, key) not in self.muscles:
+            canonical = get_canonicalizer().canonical(muscle)
+            if canonical:
+                key = normalize(canonical) if " | " in key else split_name(canonical)[0]
+        return self.muscles.get((role, key), 0)
+
+    def filter_mask(self, muscles=(), role: str = None, equipment=()) -> int:
+        """AND of every muscle and equipment filter; all exercises when there are none"""
+        mask = self.all_docs
+        for muscle in muscles:
+            mask &= self.muscle_mask(muscle, role)
+        for item in equipment:
+            mask &= self.equipment.get(item.casefold(), 0)
+        return mask
+
+    def _collapse(self, docs, limit: int, collapse: bool) -> list:
+        """First ``limit`` docs of a ranked iterable, skipping variants of an earlier doc when collapsing"""
+        if not collapse:
+            return list(docs)[:limit]
+        seen = set()
+        kept = []
+        for doc in docs:
+            family = self.families[doc] or self.paths[doc]
+            if family in seen:
+                continue
+            seen.add(family)
+            kept.append(doc)
+            if len(kept) == limit:
+                break
+        return kept
+
+    def search(self, query: str, muscles=(), role: str = None, equipment=(),
+               limit: int = DEFAULT_LIMIT, collapse: bool = False) -> list:
+        """
+        BM25-ranked exercises for ``query``. Quoted and hyphenated phrases are
+        required; other words are optional and ranked. An empty query lists the
+        filtered exercises by title. ``collapse`` keeps one exercise per variant family.
+        """
+        if isinstance(muscles, str):
+            muscles = [muscles]
+        if isinstance(equipment, str):
+            equipment = [equipment]
+        mask = self.filter_mask(muscles, role, equipment)
+        if not mask:
+            return []
+
+        required = []
+        for phrase in _QUOTED_RE.findall(query):
+            terms = analyze(phrase)
+            required.extend(bigrams(terms) or terms)
+        for token in tokenize(_QUOTED_RE.sub(" ", query)):
+            if isinstance(token, tuple):
+                terms = analyze(" ".join(token))
+                required.extend(bigrams(terms) or terms)
+        terms = analyze(query)
+        optional = terms + bigrams(terms)
+
+        for term in required:
+            mask &= self._term_mask(term)
+            if not mask:
+                return []
+
+        scores = {}
+        for term in optional:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            docs = memoryview(posting[0]).cast("H")
+            impacts = memoryview(posting[1]).cast("f")
+            for doc, impact in zip(docs, impacts):
+                if mask >> doc & 1:
+                    scores[doc] = scores.get(doc, 0.0) + impact
+
+        if not terms:
+            docs = sorted(_bits(mask), key=self.titles.__getitem__)
+            return [self._result(doc) for doc in self._collapse(docs, limit, collapse)]
+        if collapse:
+            ranked = sorted(scores, key=lambda doc: (-scores[doc], doc))
+        else:
+            ranked = [doc for doc, _ in heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))]
+        return [self._result(doc, scores[doc]) for doc in self._collapse(ranked, limit, collapse)]
+
+    def _term_mask(self, term: str) -> int:
+        posting = self.postings.get(term)
+        if posting is None:
+            return 0
+        mask = 0
+        for doc in memoryview(posting[0]).cast("H"):
+            mask |= 1 << doc
+        return mask
+
+    def _prefix_words(self, prefix: str) -> list:
+        start = bisect_left(self.vocabulary, prefix)
+        words = []
+        for word in self.vocabulary[start:]:
+            if not word.startswith(prefix):
+                break
+            words.append(word)
+        return words
+
+    def _word_candidates(self, word: str, prefix: bool) -> tuple:
+        """(exact mask, typo mask) of titles containing ``word`` (or a word starting with it)"""
+        if prefix:
+            exact = 0
+            for match in self._prefix_words(word):
+                exact |= self.title_words[match]
+        else:
+            exact = self.title_words.get(word, 0)
+        typo = 0
+        if len(word) >= MIN_TYPO_LENGTH:
+            table = self.typo_prefixes if prefix else self.typo_words
+            matches = set(table.get(word, ()))
+            for variant in deletes(word):
+                matches.update(table.get(variant, ()))
+                if not prefix and variant in self.title_words:
+                    matches.add(variant)
+            for match in matches:
+                typo |= self.title_words[match]
+        return exact, typo & ~exact
+
+    def suggest(self, text: str, limit: int = DEFAULT_LIMIT, muscles=(), role: str = None,
+                equipment=(), collapse: bool = False) -> list:
+        """
+        Title completions for ``text``: earlier words must match a title word
+        (one typo allowed), the last word is matched as a prefix. Titles needing
+        fewer typo corrections rank first, then shorter titles.
+        """
+        words = [w for token in tokenize(text) for w in (token if isinstance(token, tuple) else (token,))]
+        if not words:
+            return []
+        if isinstance(muscles, str):
+            muscles = [muscles]
+        if isinstance(equipment, str):
+            equipment = [equipment]
+        candidates = self.filter_mask(muscles, role, equipment)
+        typo_masks = []
+        for i, word in enumerate(words):
+            exact, typo = self._word_candidates(word, prefix=i == len(words) - 1 and not text[-1:].isspace())
+            candidates &= exact | typo
+            if not candidates:
+                return []
+            typo_masks.append(typo)
+
+        ranked = []
+        for doc in _bits(candidates):
+            typos = sum(mask >> doc & 1 for mask in typo_masks)
+            ranked.append((typos, len(self.titles[doc]), self.titles[doc], doc))
+        ranked = sorted(ranked) if collapse else heapq.nsmallest(limit, ranked)
+        return [self._result(doc) for doc in self._collapse((doc for *_, doc in ranked), limit, collapse)]
+
+
+def load_index(path: Path = INDEX_PATH, build_missing: bool = True) -> SearchIndex:
+    """Open the index, building it first when the file does not exist yet"""
+    if build_missing and not Path(path).exists():
+        build(path)
+    return SearchIndex(path)
+
+
+def benchmark(path: Path, repeat: int = 200):
+    started = time.perf_counter()
+    index = SearchIndex(path)
+    cold_ms = (time.perf_counter() - started) * 1000
+
+    queries = [
+        ("incline", {}),
+        ("single-arm row", {}),
+        ('"hip hinge"', {}),
+        ("squat", {"equipment": ["Barbell"]}),
+        ("press", {"muscles": ["Pectoralis Major"], "role": "target"}),
+        ("stretch hamstrings lying", {}),
+    ]
+    print(f"Cold load:  {cold_ms:8.2f} ms ({len(index)} exercises, {len(index.postings)} terms)")
+    for query, filters in queries:
+        index.search(query, **filters)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            index.search(query, **filters)
+        elapsed_us = (time.perf_counter() - started) / repeat * 1e6
+        label = query + (f" {filters}" if filters else "")
+        print(f"search  {label:58s} {elapsed_us:8.1f} µs")
+    for text in ("ben", "bench pr", "benhc pre", "dumbel curl", "lat pul"):
+        index.suggest(text)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            index.suggest(text)
+        elapsed_us = (time.perf_counter() - started) / repeat * 1e6
+        print(f"suggest {text:58s} {elapsed_us:8.1f} µs")
+
+
+def _print_results(results: list):
+    if not results:
+        print("No matches")
+    for result in results:
+        score = f"{result['score']:7.3f}  " if "score" in result else ""
+        print(f"{score}{result['title']}  ({result['exercise_path']})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full-text exercise search")
+    parser.add_argument("--index", type=Path, default=INDEX_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Build the search index from the exercise CSV")
+
+    search = sub.add_parser("search", help="BM25 search over titles and descriptions")
+    search.add_argument("query", nargs="?", default="")
+    suggest = sub.add_parser("suggest", help="Title autocomplete")
+    suggest.add_argument("text")
+    for command in (search, suggest):
+        command.add_argument("--muscle", action="append", default=[], help="Filter by muscle (repeatable)")
+        command.add_argument("--role", choices=MUSCLE_ROLES, default=None, help="Restrict --muscle to one role")
+        command.add_argument("--equipment", action="append", default=[], help="Filter by equipment (repeatable)")
+        command.add_argument("-k", "--limit", type=int, default=DEFAULT_LIMIT)
+        command.add_argument("--collapse", action="store_true", help="One exercise per variant family")
+    sub.add_parser("bench", help="Measure cold load and query latency")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        started = time.perf_counter()
+        size = build(args.index)
+        print(f"Saved {args.index} ({size / 1024:.0f} KB) in {time.perf_counter() - started:.2f}s")
+        return 0
+
+    index = load_index(args.index)
+    if index.is_stale():
+        print(f"{args.index} is older than {EXERCISES_CSV.name}, run the build command", file=sys.stderr)
+    if args.command == "bench":
+        benchmark(args.index)
+    elif args.command == "search":
+        _print_results(index.search(args.query, args.muscle, args.role, args.equipment, args.limit,
+                                    args.collapse))
+    else:
+        _print_results(index.suggest(args.text, args.limit, args.muscle, args.role, args.equipment,
+                                     args.collapse))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# /// script
+# requires-python = ">=3.9"
+# dependencies = [
+#     "numpy",
+# ]
+# ///
+"""
+Exercise substitution search over role-weighted muscle activation profiles.
+
+Each exercise becomes a vector over the distinct muscle names in the dataset,
+weighted by the role the muscle plays (target > synergist > stabilizer).
+Lengthening muscles live in their own block of columns so that stretches are
+matched with stretches rather than with exercises loading the same muscle.
+"""
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from exercise_data import MUSCLE_ROLES, load_exercises
+
+# Contribution of a muscle to the exercise vector, by role
+ROLE_WEIGHTS = {
+    "target": 1.0,
+    "synergist": 0.5,
+    "stabilizer": 0.25,
+    "lengthening": 1.0,
+}
+
+METRICS = ("cosine", "jaccard")
+
+NEIGHBOURS_CSV = Path("exercise_neighbours.csv")
+
+
+class ExerciseIndex:
+    """Precomputed muscle matrix for similarity queries over all exercises"""
+
+    def __init__(self, exercises: list, role_weights: dict = ROLE_WEIGHTS):
+        self.exercises = exercises
+        self.role_weights = role_weights
+
+        # Column per (block, muscle); lengthening gets its own block
+        columns = {}
+        entries = []
+        for row, exercise in enumerate(exercises):
+            for role in MUSCLE_ROLES:
+                weight = role_weights.get(role, 0.0)
+                if not weight:
+                    continue
+                block = "lengthening" if role == "lengthening" else "active"
+                for muscle in exercise[f"{role}_muscles"]:
+                    key = (block, muscle.casefold())
+                    col = columns.setdefault(key, len(columns))
+                    entries.append((row, col, weight))
+
+        self.columns = columns
+        matrix = np.zeros((len(exercises), len(columns)), dtype=np.float32)
+        for row, col, weight in entries:
+            # A muscle listed under several roles keeps its strongest weight
+            matrix[row, col] = max(matrix[row, col], weight)
+        self.matrix = matrix
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.normalized = matrix / norms
+
+        # Lookup by exercise_path, exact title and config slug
+        self._lookup = {}
+        for row, exercise in enumerate(exercises):
+            for key in (exercise["exercise_path"], exercise["title"], exercise["slug"]):
+                self._lookup.setdefault(key, row)
+                self._lookup.setdefault(key.casefold(), row)
+
+        self._equipment = [frozenset(e["equipment"]) for e in exercises]
+
+    @classmethod
+    def from_csv(cls, path=None) -> "ExerciseIndex":
+        return cls(load_exercises(path) if path else load_exercises())
+
+    def resolve(self, exercise) -> int:
+        """Row index for an exercise given as row number, path, title or slug"""
+        if isinstance(exercise, (int, np.integer)):
+            return int(exercise)
+        row = self._lookup.get(exercise, self._lookup.get(str(exercise).casefold()))
+        if row is None:
+            raise KeyError(f"Unknown exercise: {exercise}")
+        return row
+
+    def equipment_mask(self, equipment_filter) -> np.ndarray:
+        """
+        Boolean mask of exercises that only need the available equipment.
+        Exercises without inferred equipment are always allowed.
+        """
+        if equipment_filter is None:
+            return np.ones(len(self.exercises), dtype=bool)
+        available = frozenset(equipment_filter)
+        return np.fromiter((needed <= available for needed in self._equipment),
+                           dtype=bool, count=len(self.exercises))
+
+    def scores(self, row: int, metric: str = "cosine") -> np.ndarray:
+        """Similarity of every exercise to the exercise at ``row``"""
+        if metric == "cosine":
+            return self.normalized @ self.normalized[row]
+        if metric == "jaccard":
+            # Weighted Jaccard: sum(min) / sum(max) per exercise
+            vector = self.matrix[row]
+            union = np.maximum(self.matrix, vector).sum(axis=1)
+            union[union == 0] = 1.0
+            return np.minimum(self.matrix, vector).sum(axis=1) / union
+        raise ValueError(f"Unknown metric '{metric}', expected one of {METRICS}")
+
+    def similar(self, exercise, k: int = 10, equipment_filter=None, metric: str = "cosine") -> list:
+        """
+        Top-k substitutes for ``exercise`` as (exercise dict, score) tuples, best first.
+        ``equipment_filter`` is the set of available equipment (None means anything).
+        """
+        row = self.resolve(exercise)
+        scores = self.scores(row, metric).astype(np.float32, copy=True)
+        scores[~self.equipment_mask(equipment_filter)] = -np.inf
+        scores[row] = -np.inf
+
+        candidates = int(np.isfinite(scores).sum())
+        k = min(k, candidates)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.exercises[i], float(scores[i])) for i in top]
+
+    def all_neighbours(self, k: int = 10):
+        """
+        Cosine nearest neighbours for every exercise with a single matrix multiply.
+        Returns (indices, scores) arrays of shape (n_exercises, k), best first.
+        """
+        sims = self.normalized @ self.normalized.T
+        np.fill_diagonal(sims, -np.inf)
+        k = min(k, len(self.exercises) - 1)
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+    def write_neighbours(self, path: Path = NEIGHBOURS_CSV, k: int = 10) -> int:
+        """Write the all-pairs nearest-neighbour table to CSV, returns the number of rows"""
+        indices, scores = self.all_neighbours(k)
+        rows = 0
+        with Path(path).open("w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["exercise_path", "title", "rank", "neighbour_path", "neighbour_title", "score"])
+            for i, exercise in enumerate(self.exercises):
+                for rank, (j, score) in enumerate(zip(indices[i], scores[i]), 1):
+                    neighbour = self.exercises[j]
+                    writer.writerow([exercise["exercise_path"], exercise["title"], rank,
+                                     neighbour["exercise_path"], neighbour["title"], f"{score:.4f}"])
+                    rows += 1
+        return rows
+
+
+_default_index = None
+
+
+def similar(exercise, k: int = 10, equipment_filter=None, metric: str = "cosine") -> list:
+    """Module-level shortcut that lazily builds an index over the default CSV"""
+    global _default_index
+    if _default_index is None:
+        _default_index = ExerciseIndex.from_csv()
+    return _default_index.similar(exercise, k=k, equipment_filter=equipment_filter, metric=metric)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find substitute exercises by muscle activation profile")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    query = sub.add_parser("similar", help="Rank substitutes for one exercise")
+    query.add_argument("exercise", help="Exercise title, path (/exercise/123) or slug")
+    query.add_argument("-k", type=int, default=10)
+    query.add_argument("--metric", choices=METRICS, default="cosine")
+    query.add_argument("--equipment", nargs="*", default=None,
+                       help="Available equipment, e.g. --equipment Dumbbell Bench")
+
+    batch = sub.add_parser("neighbours", help="Write the nearest-neighbour table for all exercises")
+    batch.add_argument("-k", type=int, default=10)
+    batch.add_argument("--output", type=Path, default=NEIGHBOURS_CSV)
+
+    args = parser.parse_args(argv)
+    index = ExerciseIndex.from_csv()
+
+    if args.command == "similar":
+        try:
+            results = index.similar(args.exercise, k=args.k, equipment_filter=args.equipment, metric=args.metric)
+        except KeyError as e:
+            print(e.args[0], file=sys.stderr)
+            return 1
+        for exercise, score in results:
+            equipment = ", ".join(exercise["equipment"]) or "-"
+            print(f"{score:.3f}  {exercise['title']}  [{equipment}]")
+    else:
+        rows = index.write_neighbours(args.output, k=args.k)
+        print(f"Saved {rows} neighbour rows to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+# /// script
+# requires-python = ">=3.9"
+# dependencies = [
+#     "numpy",
+# ]
+# ///
+"""
+Group near-duplicate exercises into variant families.
+
+Titles (without the parenthesised equipment) and descriptions are shingled and
+summarised by MinHash signatures. LSH banding over the signatures yields
+candidate pairs without comparing every pair. A candidate pair is a variant
+pair when its estimated text similarity (the better of title and description
+Jaccard) reaches ``TEXT_THRESHOLD``, its titles alone reach ``TITLE_THRESHOLD``
+and its muscle profiles (cosine over the vectors of ``exercise_similarity.py``)
+reach ``MUSCLE_THRESHOLD``. "Bench Press (Barbell)" and "Bench Press
+(Dumbbell)" are variants, while "Incline Bench Press" loads the muscles
+differently and stays apart.
+
+Pairs are merged best first, and two families only merge when every member of
+one is a variant pair with every member of the other (complete linkage), so a
+family never holds two exercises that fail the test. Each family is identified
+by the ``exercise_path`` of its representative (the shortest title).
+
+    uv run exercise_variants.py build            # -> exercise_variants.csv
+    uv run exercise_variants.py family "Hip Thrust (Barbell)"
+
+``exercise_search.py`` picks the families up on its next build and can
+collapse results to one exercise per family.
+"""
+
+import argparse
+import csv
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from exercise_data import VARIANTS_CSV, load_exercises
+from exercise_db import fnv1a
+from exercise_search import analyze, bigrams
+from exercise_similarity import ExerciseIndex
+
+NUM_PERM = 120
+BANDS = 40
+ROWS = NUM_PERM // BANDS
+# Mersenne prime for the universal hashes; a * x stays below 2**62
+PRIME = (1 << 31) - 1
+SEED = 1
+
+TEXT_THRESHOLD = 0.5
+MUSCLE_THRESHOLD = 0.8
+# Titles must overlap too: many descriptions share boilerplate ("This exercise has two main aims")
+TITLE_THRESHOLD = 0.25
+# Word n-gram length of description shingles
+DESCRIPTION_SHINGLE = 3
+
+_EMPTY = np.full(NUM_PERM, PRIME, dtype=np.uint64)
+_PARENS = re.compile(r"\([^)]*\)")
+
+
+def title_shingles(title: str) -> set:
+    """Stemmed words and word bigrams of the title without its parenthesised variant"""
+    terms = analyze(_PARENS.sub(" ", title))
+    return set(terms) | set(bigrams(terms))
+
+
+def description_shingles(description: str, size: int = DESCRIPTION_SHINGLE) -> set:
+    terms = analyze(description)
+    if len(terms) <= size:
+        return {" ".join(terms)} if terms else set()
+    return {" ".join(terms[i:i + size]) for i in range(len(terms) - size + 1)}
+
+
+class MinHasher:
+    """NUM_PERM universal hash functions (a * x + b) mod PRIME over FNV-1a shingle hashes"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = SEED):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingles: set) -> np.ndarray:
+        if not shingles:
+            return _EMPTY
+        x = np.fromiter((fnv1a(s.encode("utf-8")) % PRIME for s in shingles), dtype=np.uint64, count=len(shingles))
+        return ((np.outer(x, self.a) + self.b) % PRIME).min(axis=0)
+
+    def signatures(self, shingle_sets: list) -> np.ndarray:
+        return np.stack([self.signature(s) for s in shingle_sets]) if shingle_sets else np.empty((0, NUM_PERM))
+
+
+def lsh_candidates(signatures: np.ndarray, empty: np.ndarray, bands: int = BANDS) -> set:
+    """(i, j) row pairs, i < j, that share at least one band bucket"""
+    rows = signatures.shape[1] // bands
+    pairs = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        chunk = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        for row in np.flatnonzero(~empty):
+            buckets[chunk[row].tobytes()].append(row)
+        for members in buckets.values():
+            for n, i in enumerate(members):
+                for j in members[n + 1:]:
+                    pairs.add((int(i), int(j)))
+    return pairs
+
+
+class VariantGrouper:
+    """MinHash signatures, muscle vectors and the clustering over one exercise list"""
+
+    def __init__(self, exercises: list, text_threshold: float = TEXT_THRESHOLD,
+                 muscle_threshold: float = MUSCLE_THRESHOLD, title_threshold: float = TITLE_THRESHOLD):
+        self.exercises = exercises
+        self.text_threshold = text_threshold
+        self.muscle_threshold = muscle_threshold
+        self.title_threshold = title_threshold
+
+        hasher = MinHasher()
+        titles = [title_shingles(e["title"]) for e in exercises]
+        descriptions = [description_shingles(e["description"]) for e in exercises]
+        self.title_signatures = hasher.signatures(titles)
+        self.description_signatures = hasher.signatures(descriptions)
+        self._no_title = np.array([not s for s in titles], dtype=bool)
+        self._no_description = np.array([not s for s in descriptions], dtype=bool)
+        self.muscles = ExerciseIndex(exercises).normalized
+
+    @staticmethod
+    def _jaccard(signatures: np.ndarray, empty: np.ndarray, i: int, j: int) -> float:
+        return 0.0 if empty[i] or empty[j] else float(np.mean(signatures[i] == signatures[j]))
+
+    def title_similarity(self, i: int, j: int) -> float:
+        return self._jaccard(self.title_signatures, self._no_title, i, j)
+
+    def text_similarity(self, i: int, j: int) -> float:
+        """Estimated Jaccard of titles or descriptions, whichever is higher"""
+        return max(self.title_similarity(i, j),
+                   self._jaccard(self.description_signatures, self._no_description, i, j))
+
+    def pair_score(self, i: int, j: int):
+        """Mean of text and muscle similarity for a variant pair, None when the pair fails a threshold"""
+        muscle = float(self.muscles[i] @ self.muscles[j])
+        if muscle < self.muscle_threshold:
+            return None
+        if self.title_similarity(i, j) < self.title_threshold:
+            return None
+        text = self.text_similarity(i, j)
+        if text < self.text_threshold:
+            return None
+        return (text + muscle) / 2
+
+    def candidates(self) -> set:
+        return lsh_candidates(self.title_signatures, self._no_title) | \
+            lsh_candidates(self.description_signatures, self._no_description)
+
+    def families(self) -> list:
+        """Family index per exercise row; families are numbered by their first row"""
+        scored = []
+        for i, j in self.candidates():
+            score = self.pair_score(i, j)
+            if score is not None:
+                scored.append((score, i, j))
+        scored.sort(key=lambda item: (-item[0], item[1], item[2]))
+
+        parent = list(range(len(self.exercises)))
+        members = [[row] for row in range(len(self.exercises))]
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for _, i, j in scored:
+            a, b = find(i), find(j)
+            if a == b:
+                continue
+            # Complete linkage: every member must be a variant of every member of the other family,
+            # otherwise A~B and B~C would chain A and C together
+            if any(self.pair_score(x, y) is None for x in members[a] for y in members[b]):
+                continue
+            if len(members[a]) < len(members[b]):
+                a, b = b, a
+            parent[b] = a
+            members[a].extend(members[b])
+            members[b] = []
+
+        numbering = {}
+        return [numbering.setdefault(find(row), len(numbering)) for row in range(len(self.exercises))]
+
+    def group(self) -> list:
+        """
+        One dict per exercise: exercise_path, title, family_id (representative's
+        exercise_path), family_size and representative title
+        """
+        families = self.families()
+        members = defaultdict(list)
+        for row, family in enumerate(families):
+            members[family].append(row)
+        representative = {
+            family: min(rows, key=lambda r: (len(self.exercises[r]["title"]), r))
+            for family, rows in members.items()
+        }
+        result = []
+        for row, family in enumerate(families):
+            rep = self.exercises[representative[family]]
+            result.append({
+                "exercise_path": self.exercises[row]["exercise_path"],
+                "title": self.exercises[row]["title"],
+                "family_id": rep["exercise_path"],
+                "family_size": len(members[family]),
+                "representative": rep["title"],
+            })
+        return result
+
+
+def write_variants(rows: list, path: Path = VARIANTS_CSV) -> int:
+    with Path(path).open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["exercise_path", "title", "family_id", "family_size", "representative"])
+        writer.writeheader()
+        writer.writerows(rows)
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Group near-duplicate exercises into variant families")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Cluster every exercise and write the family table")
+    build.add_argument("--output", type=Path, default=VARIANTS_CSV)
+    build.add_argument("--text-threshold", type=float, default=TEXT_THRESHOLD)
+    build.add_argument("--muscle-threshold", type=float, default=MUSCLE_THRESHOLD)
+    build.add_argument("--title-threshold", type=float, default=TITLE_THRESHOLD)
+    family = sub.add_parser("family", help="Show the variant family of one exercise")
+    family.add_argument("exercise", help="Exercise title or path (/exercise/123)")
+
+    args = parser.parse_args(argv)
+    exercises = load_exercises()
+
+    if args.command == "build":
+        started = time.perf_counter()
+        grouper = VariantGrouper(exercises, args.text_threshold, args.muscle_threshold, args.title_threshold)
+        rows = grouper.group()
+        elapsed = time.perf_counter() - started
+        write_variants(rows, args.output)
+        families = {row["family_id"] for row in rows}
+        merged = sum(1 for row in rows if row["family_size"] > 1)
+        print(f"{len(rows)} exercises -> {len(families)} families ({merged} exercises in multi-member "
+              f"families) in {elapsed:.2f}s, saved {args.output}")
+        return 0
+
+    rows = VariantGrouper(exercises).group()
+    key = args.exercise.casefold()
+    match = next((r for r in rows if key in (r["exercise_path"].casefold(), r["title"].casefold())), None)
+    if match is None:
+        print(f"Unknown exercise: {args.exercise}", file=sys.stderr)
+        return 1
+    print(f"Family {match['family_id']} ({match['representative']}):")
+    for row in rows:
+        if row["family_id"] == match["family_id"]:
+            print(f"    {row['title']}  ({row['exercise_path']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
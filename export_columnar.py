@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# /// script
+# requires-python = ">=3.9"
+# dependencies = [
+#     "pyarrow",
+# ]
+# ///
+"""
+Columnar export of the exercise dataset.
+
+Writes the exercise CSV as Arrow IPC (for zero-copy memory-mapped reads) and
+Parquet (compressed, for interchange), with proper list columns:
+
+- ``<role>_muscles``: ``list<string>`` with the raw scraped names
+- ``<role>_muscle_ids``: ``list<int16>`` ids into the muscles table
+- ``equipment``: ``list<string>``
+
+The muscles table holds one row per distinct muscle name with its canonical
+name, SVG group and broad group, so consumers never re-parse ``"; "`` fields.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from exercise_data import MUSCLE_ROLES, load_exercises
+from muscle_names import get_canonicalizer
+
+OUTPUT_DIR = Path(".")
+EXERCISES_NAME = "exercises"
+MUSCLES_NAME = "muscles"
+
+MUSCLE_ID_TYPE = pa.int16()
+
+MUSCLES_SCHEMA = pa.schema([
+    ("muscle_id", MUSCLE_ID_TYPE),
+    ("name", pa.string()),
+    ("canonical", pa.string()),
+    ("svg_muscle_group", pa.dictionary(pa.int8(), pa.string())),
+    ("broad_muscle_group", pa.dictionary(pa.int8(), pa.string())),
+])
+
+EXERCISES_SCHEMA = pa.schema(
+    [
+        ("exercise_path", pa.string()),
+        ("slug", pa.string()),
+        ("title", pa.string()),
+        ("url", pa.string()),
+        ("description", pa.string()),
+        ("equipment", pa.list_(pa.string())),
+    ]
+    + [(f"{role}_muscles", pa.list_(pa.string())) for role in MUSCLE_ROLES]
+    + [(f"{role}_muscle_ids", pa.list_(MUSCLE_ID_TYPE)) for role in MUSCLE_ROLES]
+)
+
+
+def build_tables(exercises: list = None) -> tuple:
+    """Build (exercises, muscles) Arrow tables from the parsed CSV"""
+    exercises = exercises if exercises is not None else load_exercises()
+    muscle_names = get_canonicalizer()
+
+    muscle_ids = {}
+    for exercise in exercises:
+        for role in MUSCLE_ROLES:
+            for muscle in exercise[f"{role}_muscles"]:
+                muscle_ids.setdefault(muscle, len(muscle_ids))
+
+    names = list(muscle_ids)
+    muscles = pa.Table.from_pydict(
+        {
+            "muscle_id": list(range(len(names))),
+            "name": names,
+            "canonical": [muscle_names.canonical(name) for name in names],
+            "svg_muscle_group": [muscle_names.svg_slug(name) for name in names],
+            "broad_muscle_group": [muscle_names.broad_group(name) for name in names],
+        },
+        schema=MUSCLES_SCHEMA,
+    )
+
+    columns = {name: [] for name in EXERCISES_SCHEMA.names}
+    for exercise in exercises:
+        for name in ("exercise_path", "slug", "title", "url", "description", "equipment"):
+            columns[name].append(exercise[name])
+        for role in MUSCLE_ROLES:
+            role_muscles = exercise[f"{role}_muscles"]
+            columns[f"{role}_muscles"].append(role_muscles)
+            columns[f"{role}_muscle_ids"].append([muscle_ids[m] for m in role_muscles])
+    table = pa.Table.from_pydict(columns, schema=EXERCISES_SCHEMA)
+    return table, muscles
+
+
+def write_tables(output_dir: Path = OUTPUT_DIR, exercises: list = None) -> list:
+    """Write Arrow IPC and Parquet files for both tables, returns the written paths"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name, table in zip((EXERCISES_NAME, MUSCLES_NAME), build_tables(exercises)):
+        # Uncompressed IPC so the file can be memory-mapped without decoding
+        arrow_path = output_dir / f"{name}.arrow"
+        with pa.OSFile(str(arrow_path), "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        parquet_path = output_dir / f"{name}.parquet"
+        pq.write_table(table, parquet_path, compression="zstd")
+        written.extend([arrow_path, parquet_path])
+    return written
+
+
+def read_table(path: Path) -> pa.Table:
+    """
+    Read an exported table. ``.arrow`` files are memory-mapped, so the
+    returned buffers point straight into the page cache (zero-copy).
+    """
+    path = Path(path)
+    if path.suffix == ".arrow":
+        source = pa.memory_map(str(path), "r")
+        return ipc.open_file(source).read_all()
+    return pq.read_table(path)
+
+
+def load_dataset(directory: Path = OUTPUT_DIR, fmt: str = "arrow") -> tuple:
+    """(exercises, muscles) tables from a previous export"""
+    directory = Path(directory)
+    return (read_table(directory / f"{EXERCISES_NAME}.{fmt}"),
+            read_table(directory / f"{MUSCLES_NAME}.{fmt}"))
+
+
+def benchmark(directory: Path, repeat: int = 5):
+    """Compare CSV parsing against Arrow and Parquet loads"""
+    def best(fn):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings) * 1000
+
+    print(f"CSV parse:           {best(load_exercises):8.2f} ms")
+    print(f"Arrow (memory-map):  {best(lambda: load_dataset(directory, 'arrow')):8.2f} ms")
+    print(f"Parquet:             {best(lambda: load_dataset(directory, 'parquet')):8.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the exercise dataset to Arrow/Parquet")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Write exercises/muscles .arrow and .parquet files")
+    export.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+
+    bench = sub.add_parser("bench", help="Compare load times of CSV, Arrow and Parquet")
+    bench.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        for path in write_tables(args.output_dir):
+            print(f"Saved {path} ({path.stat().st_size / 1024:.0f} KB)")
+    else:
+        if not (args.output_dir / f"{EXERCISES_NAME}.arrow").exists():
+            print(f"No export found in {args.output_dir}, run the export command first", file=sys.stderr)
+            return 1
+        benchmark(args.output_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# /// script
+# requires-python = ">=3.9"
+# dependencies = []
+# ///
+"""
+Load test for query_service.py.
+
+Opens keep-alive connections from a single process (one core), replays a mix
+of endpoints and reports requests/sec and latency percentiles.
+
+    uv run query_service.py &
+    uv run load_test.py --connections 16 --duration 10
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from exercise_db import DB_PATH, ExerciseDB
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+
+def build_targets(db_path=DB_PATH, sample: int = 200) -> list:
+    """Request mix: exercise by slug, SVG ids, muscle search and the hierarchy"""
+    with ExerciseDB(db_path) as db:
+        slugs = [db.exercise(row, fields=("slug",), muscles=False)["slug"] for row in range(len(db))]
+        muscles = [db.muscle(i)["name"] for i in range(min(db.n_muscles, 40))]
+    rng = random.Random(42)
+    targets = []
+    for slug in rng.sample(slugs, min(sample, len(slugs))):
+        targets.append(f"/exercises/{slug}")
+        targets.append(f"/exercises/{slug}/svg")
+    for muscle in muscles:
+        targets.append(f"/exercises?muscle={muscle.replace(' ', '%20').replace(',', '%2C')}&role=target&limit=20")
+    targets.append("/muscles")
+    rng.shuffle(targets)
+    return targets
+
+
+async def worker(host: str, port: int, targets: list, deadline: float, latencies: list, headers: str):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = random.randrange(len(targets))
+    try:
+        while time.perf_counter() < deadline:
+            target = targets[i % len(targets)]
+            i += 1
+            started = time.perf_counter()
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n{headers}\r\n".encode("latin-1"))
+            await writer.drain()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            if length:
+                await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(args) -> int:
+    targets = build_targets(args.db)
+    headers = "Accept-Encoding: gzip\r\n" if args.gzip else ""
+    latencies = []
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(worker(args.host, args.port, targets, deadline, latencies, headers)
+                           for _ in range(args.connections)))
+    elapsed = time.perf_counter() - started
+    if not latencies:
+        print("No requests completed", file=sys.stderr)
+        return 1
+    latencies.sort()
+    print(f"Requests:     {len(latencies)} in {elapsed:.1f}s over {args.connections} connections")
+    print(f"Throughput:   {len(latencies) / elapsed:,.0f} req/s")
+    for pct in (50, 90, 99):
+        print(f"p{pct}:          {percentile(latencies, pct) * 1000:.2f} ms")
+    print(f"max:          {latencies[-1] * 1000:.2f} ms")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the exercise query service")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--db", default=DB_PATH, help="Dataset file used to build the request mix")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    parser.add_argument("--gzip", action="store_true", help="Send Accept-Encoding: gzip")
+    args = parser.parse_args(argv)
+    try:
+        return asyncio.run(run(args))
+    except ConnectionRefusedError:
+        print(f"Could not connect to {args.host}:{args.port}, is query_service.py running?", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# /// script
+# requires-python = ">=3.9"
+# dependencies = []
+# ///
+"""
+Muscle name canonicalizer shared by the scraper and the config tooling.
+
+Scraped muscle strings are inconsistent ("Biceps fermoris", "Lattisimus dorsi",
+"Triceps Brachii ( long head, lateral head )", "Gastrocnemius (calf)"). Names
+are resolved to the canonical spelling in ``muscles_mapped_pruned.csv`` by:
+
+1. the persisted alias table (``muscle_aliases.csv``, other spellings of the
+   same muscle only)
+2. an exact match on the normalised form (case, whitespace, footnote numbers,
+   parenthesised or comma-separated qualifiers, head/part qualifiers)
+3. the same match with the head qualifier dropped
+4. a fuzzy match against the canonical names (typos)
+
+Results are cached per raw string. Fuzzy matches are remembered as learned
+aliases so they can be reviewed and persisted with ``--save``.
+
+Muscles the anatomy SVGs do not draw ("Longus Colli", "Flexor Hallucis
+Longus") stay unresolved. ``muscle_svg_proxies.csv`` names the muscle drawn in
+their place, and only ``svg_slug`` and ``build_muscle_to_svg`` consult it.
+"""
+
+import argparse
+import csv
+import difflib
+import json
+import re
+import sys
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+from exercise_data import (
+    CONFIG_JSON,
+    MUSCLE_ROLES,
+    MUSCLES_PRUNED_CSV,
+    ROOT,
+    load_csv_rows,
+    load_exercises,
+)
+
+ALIASES_CSV = ROOT / "muscle_aliases.csv"
+SVG_PROXIES_CSV = ROOT / "muscle_svg_proxies.csv"
+
+# Minimum difflib ratio for a fuzzy match to be accepted
+FUZZY_CUTOFF = 0.85
+
+# Words describing which part of a muscle is meant, e.g. "Pectoralis Major, Clavicular Head"
+HEAD_WORDS = {
+    "long", "short", "lateral", "medial", "clavicular", "sternal", "abdominal",
+    "upper", "middle", "lower", "anterior", "posterior",
+}
+# Words that tell two different muscles apart; a fuzzy match may not change them
+DISTINGUISHING_WORDS = HEAD_WORDS | {
+    "flexor", "extensor", "internal", "external", "major", "minor", "longus",
+    "brevis", "superior", "inferior", "superficial", "deep", "profundus",
+}
+# Filler words dropped from a head qualifier so "Clavicular Head" == "Clavicular Part"
+HEAD_FILLER = {"head", "heads", "part", "portion", "fibers", "fibres"}
+
+_FOOTNOTE = re.compile(r"\(\s*\d+\s*\)")
+_PARENS = re.compile(r"\(([^)]*)\)")
+_INLINE_HEAD = re.compile(r"^(.*?)\s+((?:%s)\s+head)$" % "|".join(sorted(HEAD_WORDS)))
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def _words(text: str) -> str:
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def split_name(name: str) -> tuple:
+    """
+    Split a raw muscle name into (base, qualifiers), both normalised.
+    "Triceps Brachii ( long head, lateral head )" -> ("triceps brachii", ["long head", "lateral head"])
+    """
+    text = unicodedata.normalize("NFKC", name).casefold()
+    text = _FOOTNOTE.sub(" ", text)
+    qualifiers = []
+    for inner in _PARENS.findall(text):
+        qualifiers.extend(part for part in inner.split(","))
+    text = _PARENS.sub(" ", text)
+    base, *rest = text.split(",")
+    qualifiers.extend(rest)
+    base = _words(base)
+    match = _INLINE_HEAD.match(base)
+    if match:
+        base = match.group(1)
+        qualifiers.append(match.group(2))
+    return base, [q for q in (_words(q) for q in qualifiers) if q]
+
+
+def head_qualifier(qualifiers: list) -> str:
+    """The single head qualifier of a name ("clavicular"), or "" when there is none or several"""
+    heads = []
+    for qualifier in qualifiers:
+        words = qualifier.split()
+        if words and any(w in HEAD_WORDS for w in words) and all(w in HEAD_WORDS | HEAD_FILLER for w in words):
+            heads.append(" ".join(w for w in words if w not in HEAD_FILLER))
+    return heads[0] if len(heads) == 1 else ""
+
+
+def normalize(name: str) -> str:
+    """
+    Normalised lookup key: base name plus at most one head qualifier.
+    Non-head qualifiers such as "(calf)" or "(Respiration)" are dropped.
+    """
+    base, qualifiers = split_name(name)
+    head = head_qualifier(qualifiers)
+    return f"{base} | {head}" if head else base
+
+
+class MuscleCanonicalizer:
+    """Resolves raw muscle strings to canonical names from ``muscles_mapped_pruned.csv``"""
+
+    def __init__(self, canonical_csv: Path = MUSCLES_PRUNED_CSV, aliases_csv: Path = ALIASES_CSV,
+                 proxies_csv: Path = SVG_PROXIES_CSV, cutoff: float = FUZZY_CUTOFF, cache_size: int = 4096):
+        self.rows = {row["muscle"]: row for row in load_csv_rows(canonical_csv)}
+        self.cutoff = cutoff
+        self.aliases_csv = Path(aliases_csv)
+
+        # Normalised key -> canonical name; the first spelling in the CSV wins
+        self.by_key = {}
+        self.by_base = {}
+        for muscle in self.rows:
+            self.by_key.setdefault(normalize(muscle), muscle)
+            self.by_base.setdefault(split_name(muscle)[0], muscle)
+        self._keys = list(self.by_key)
+
+        self.aliases = {}
+        if self.aliases_csv.exists():
+            for row in load_csv_rows(self.aliases_csv):
+                if row["canonical"] in self.rows:
+                    self.aliases[row["alias"].casefold()] = row["canonical"]
+
+        # Normalised name -> canonical muscle drawn in its place
+        self.proxies = {}
+        if Path(proxies_csv).exists():
+            for row in load_csv_rows(proxies_csv):
+                if row["proxy"] in self.rows:
+                    self.proxies[normalize(row["muscle"])] = row["proxy"]
+
+        self.learned = {}
+        self.unresolved = Counter()
+        self.canonical = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _resolve(self, name: str):
+        """Canonical name for ``name`` or None when it cannot be resolved"""
+        raw = " ".join(name.split())
+        if not raw:
+            return None
+        alias = self.aliases.get(raw.casefold())
+        if alias:
+            return alias
+
+        key = normalize(raw)
+        if key in self.by_key:
+            return self.by_key[key]
+        base = key.split(" | ")[0]
+        if base in self.by_key:
+            return self.by_key[base]
+        if base in self.by_base:
+            return self.by_base[base]
+
+        for candidate in (key, base):
+            for match in difflib.get_close_matches(candidate, self._keys, n=3, cutoff=self.cutoff):
+                # "Flexor Digitorum Longus" is close to "Extensor Digitorum Longus" but a different muscle
+                changed = set(candidate.split()) ^ set(match.split())
+                if changed & DISTINGUISHING_WORDS:
+                    continue
+                muscle = self.by_key[match]
+                self.learned[raw] = muscle
+                return muscle
+        return None
+
+    def resolve(self, name: str, report: bool = True):
+        """Like ``canonical`` but counts names that neither resolve nor have an SVG proxy"""
+        muscle = self.canonical(name)
+        if muscle is None and report and name.strip() and normalize(name) not in self.proxies:
+            self.unresolved[name.strip()] += 1
+        return muscle
+
+    def svg_slug(self, name: str):
+        """SVG group of the muscle, or of its proxy in ``muscle_svg_proxies.csv`` when it has none"""
+        muscle = self.canonical(name)
+        slug = self.rows[muscle]["svg_muscle_group"] if muscle else ""
+        if not slug:
+            proxy = self.proxies.get(normalize(muscle or name))
+            slug = self.rows[proxy]["svg_muscle_group"] if proxy else ""
+        return slug or None
+
+    def broad_group(self, name: str):
+        muscle = self.canonical(name)
+        return (self.rows[muscle]["broad_muscle_group"] or None) if muscle else None
+
+    def build_muscle_to_svg(self, names) -> dict:
+        """Complete raw name -> SVG slug map for config generation; unresolved names are counted"""
+        mapping = {}
+        for name in names:
+            self.resolve(name)
+            slug = self.svg_slug(name)
+            if slug:
+                mapping[name] = slug
+        return mapping
+
+    def save_aliases(self, path: Path = None) -> int:
+        """Persist manual and learned aliases, returns the number of rows written"""
+        path = Path(path or self.aliases_csv)
+        existing = []
+        if path.exists():
+            existing = load_csv_rows(path)
+        known = {row["alias"].casefold() for row in existing}
+        rows = list(existing)
+        for alias, canonical in sorted(self.learned.items()):
+            if alias.casefold() not in known:
+                rows.append({"alias": alias, "canonical": canonical, "source": "fuzzy"})
+                known.add(alias.casefold())
+        with path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["alias", "canonical", "source"])
+            writer.writeheader()
+            writer.writerows(rows)
+        return len(rows)
+
+
+_default = None
+
+
+def get_canonicalizer() -> MuscleCanonicalizer:
+    """Process-wide canonicalizer built on first use"""
+    global _default
+    if _default is None:
+        _default = MuscleCanonicalizer()
+    return _default
+
+
+def canonical_muscle(name: str):
+    return get_canonicalizer().canonical(name)
+
+
+def dataset_muscle_names() -> Counter:
+    """Every muscle string used by the exercise CSV and the config mapping, with exercise counts"""
+    names = Counter()
+    for exercise in load_exercises():
+        for role in MUSCLE_ROLES:
+            names.update(exercise[f"{role}_muscles"])
+    if CONFIG_JSON.exists():
+        with CONFIG_JSON.open("r", encoding="utf-8") as f:
+            for name in json.load(f).get("muscle_to_svg_id", {}):
+                names[name] += 0
+    return names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Canonicalize muscle names")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    resolve = sub.add_parser("resolve", help="Resolve individual names")
+    resolve.add_argument("names", nargs="+")
+
+    report = sub.add_parser("report", help="Resolve every muscle name in the dataset")
+    report.add_argument("--save", action="store_true", help=f"Persist fuzzy matches to {ALIASES_CSV.name}")
+    report.add_argument("--json", action="store_true", help="Machine-readable output")
+
+    args = parser.parse_args(argv)
+    canonicalizer = get_canonicalizer()
+
+    if args.command == "resolve":
+        for name in args.names:
+            muscle = canonicalizer.canonical(name)
+            print(f"{name} -> {muscle or '?'} ({canonicalizer.svg_slug(name) or '-'})")
+        return 0
+
+    names = dataset_muscle_names()
+    for name in names:
+        canonicalizer.resolve(name)
+    unresolved = {name: names[name] for name in canonicalizer.unresolved}
+    proxied = {name: canonicalizer.svg_slug(name) for name in names
+               if canonicalizer.canonical(name) is None and name not in unresolved}
+    if args.json:
+        print(json.dumps({"learned": canonicalizer.learned, "proxied": proxied, "unresolved": unresolved},
+                         indent=2, ensure_ascii=False))
+    else:
+        print(f"{len(names)} distinct names, {len(names) - len(unresolved) - len(proxied)} resolved, "
+              f"{len(proxied)} drawn through an SVG proxy, {len(unresolved)} unresolved")
+        for alias, muscle in sorted(canonicalizer.learned.items()):
+            print(f"  fuzzy: {alias} -> {muscle}")
+        for name, count in sorted(unresolved.items(), key=lambda item: (-item[1], item[0])):
+            print(f"  unresolved: {name} ({count} uses)")
+    if args.save:
+        rows = canonicalizer.save_aliases()
+        print(f"Saved {rows} aliases to {canonicalizer.aliases_csv}", file=sys.stderr)
+    return 1 if unresolved else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
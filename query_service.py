@@ -0,0 +1,328 @@
+#!/usr/bin/env python
+# /// script
+# requires-python = ">=3.9"
+# dependencies = []
+# ///
+"""
+Local HTTP query service for exercises and muscles.
+
+Serves the compiled dataset (``exercises.wkdb``, see ``exercise_db.py``) over
+a small asyncio HTTP/1.1 server with keep-alive, an LRU response cache,
+ETag/304 revalidation and gzip.
+
+Endpoints (all GET, JSON):
+    /exercises/<slug>            one exercise by config slug
+    /exercise/<id>               one exercise by site path (/exercise/1464)
+    /exercises/<slug>/svg        SVG group slugs per role for BodyVisualization.tsx
+    /exercises?muscle=&role=&equipment=&limit=
+                                 exercises filtered by muscle (any spelling), role and equipment
+    /muscles                     broader -> broad -> SVG group -> muscle hierarchy
+    /health
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import sys
+from collections import OrderedDict
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from exercise_data import MUSCLE_ROLES, MUSCLES_PRUNED_CSV, load_csv_rows
+from exercise_db import DB_PATH, ExerciseDB
+from muscle_names import get_canonicalizer, normalize, split_name
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+CACHE_SIZE = 1024
+# Bodies smaller than this are sent uncompressed, gzip would not pay off
+GZIP_MIN_BYTES = 512
+DEFAULT_LIMIT = 100
+MAX_HEADER_LINES = 100
+
+logger = logging.getLogger("query_service")
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = ""):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class Response:
+    """Encoded response body with its ETag and a lazily built gzip variant"""
+
+    __slots__ = ("status", "body", "etag", "_gzipped")
+
+    def __init__(self, status: HTTPStatus, payload):
+        self.status = status
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = '"%s"' % hashlib.sha1(self.body).hexdigest()[:20]
+        self._gzipped = None
+
+    @property
+    def gzip_etag(self) -> str:
+        """Separate validator for the gzip body, which is a different representation"""
+        return self.etag[:-1] + '-gz"'
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped
+
+
+class ExerciseQueries:
+    """Query layer over the memory-mapped dataset"""
+
+    def __init__(self, db: ExerciseDB):
+        self.db = db
+        self.muscle_names = get_canonicalizer()
+
+        # Canonical muscle (and its base without head) -> muscle ids in the file,
+        # so any spelling finds every variant and "Biceps Femoris" includes both heads
+        self.ids_by_canonical = {}
+        self.ids_by_base = {}
+        for muscle_id in range(db.n_muscles):
+            muscle = db.muscle(muscle_id)
+            key = muscle["canonical"] or muscle["name"]
+            self.ids_by_canonical.setdefault(key, []).append(muscle_id)
+            self.ids_by_base.setdefault(split_name(key)[0], []).append(muscle_id)
+
+        self._hierarchy = self._build_hierarchy()
+
+    def _get(self, row) -> dict:
+        if row is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "Unknown exercise")
+        return self.db.exercise(row)
+
+    def exercise_by_slug(self, slug: str) -> dict:
+        return self._get(self.db.find_by_slug(slug))
+
+    def exercise_by_path(self, exercise_path: str) -> dict:
+        return self._get(self.db.find_by_path(exercise_path))
+
+    def svg_ids(self, slug: str) -> dict:
+        """SVG group slugs per role; a group keeps its strongest role (target first)"""
+        row = self.db.find_by_slug(slug)
+        if row is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "Unknown exercise")
+        seen = set()
+        result = {}
+        for role in MUSCLE_ROLES:
+            slugs = []
+            for muscle_id in self.db.muscle_ids(row, role):
+                svg = self.db.muscle(muscle_id)["svg_muscle_group"]
+                if svg and svg not in seen:
+                    seen.add(svg)
+                    slugs.append(svg)
+            result[role] = slugs
+        return {"slug": slug, "svg_ids": result}
+
+    def muscle_ids(self, name: str) -> list:
+        canonical = self.muscle_names.canonical(name)
+        if canonical:
+            if " | " not in normalize(name) and split_name(canonical)[0] in self.ids_by_base:
+                return self.ids_by_base[split_name(canonical)[0]]
+            if canonical in self.ids_by_canonical:
+                return self.ids_by_canonical[canonical]
+        muscle_id = self.db.find_muscle(name)
+        if muscle_id is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown muscle: {name}")
+        return [muscle_id]
+
+    def search(self, muscle: str = None, role: str = None, equipment: str = None,
+               limit: int = DEFAULT_LIMIT) -> dict:
+        if limit < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "limit must be 0 or more")
+        if role and role not in MUSCLE_ROLES:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"role must be one of {', '.join(MUSCLE_ROLES)}")
+        roles = [role] if role else list(MUSCLE_ROLES)
+
+        if muscle:
+            rows = set()
+            for muscle_id in self.muscle_ids(muscle):
+                for r in roles:
+                    rows.update(self.db.exercises_for_muscle(muscle_id, r))
+            rows = sorted(rows)
+        elif role:
+            rows = [row for row in range(len(self.db)) if len(self.db.muscle_ids(row, role))]
+        else:
+            rows = range(len(self.db))
+
+        results = []
+        wanted = equipment.casefold() if equipment else None
+        for row in rows:
+            exercise = self.db.exercise(row)
+            if wanted and wanted not in (e.casefold() for e in exercise["equipment"]):
+                continue
+            exercise.pop("description", None)
+            results.append(exercise)
+        return {"count": len(results), "exercises": results[:limit]}
+
+    def hierarchy(self) -> dict:
+        return self._hierarchy
+
+    @staticmethod
+    def _build_hierarchy() -> dict:
+        tree = {}
+        for row in load_csv_rows(MUSCLES_PRUNED_CSV):
+            broader = row["broader_muscle_group"] or "other"
+            broad = row["broad_muscle_group"] or "other"
+            svg = row["svg_muscle_group"] or "other"
+            tree.setdefault(broader, {}).setdefault(broad, {}).setdefault(svg, []).append(row["muscle"])
+        return tree
+
+
+class QueryService:
+    """Routing, response cache and HTTP handling"""
+
+    def __init__(self, queries: ExerciseQueries, cache_size: int = CACHE_SIZE):
+        self.queries = queries
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+
+    def route(self, path: str, query: dict):
+        parts = [unquote(p) for p in path.strip("/").split("/") if p]
+        q = self.queries
+        if parts == ["health"]:
+            return {"status": "ok", "exercises": len(q.db)}
+        if parts == ["muscles"]:
+            return q.hierarchy()
+        if parts == ["exercises"]:
+            try:
+                limit = int(query.get("limit", DEFAULT_LIMIT))
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "limit must be an integer")
+            return q.search(query.get("muscle"), query.get("role"), query.get("equipment"), limit)
+        if len(parts) == 2 and parts[0] == "exercises":
+            return q.exercise_by_slug(parts[1])
+        if len(parts) == 3 and parts[0] == "exercises" and parts[2] == "svg":
+            return q.svg_ids(parts[1])
+        if len(parts) == 2 and parts[0] == "exercise":
+            return q.exercise_by_path(f"/exercise/{parts[1]}")
+        raise HTTPError(HTTPStatus.NOT_FOUND)
+
+    def respond(self, target: str) -> Response:
+        """Cached response for a request target (path + query string)"""
+        response = self.cache.get(target)
+        if response is not None:
+            self.cache.move_to_end(target)
+            return response
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            response = Response(HTTPStatus.OK, self.route(url.path, query))
+        except HTTPError as e:
+            return Response(e.status, {"error": str(e)})
+        self.cache[target] = response
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return response
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._write(writer, Response(HTTPStatus.BAD_REQUEST, {"error": "Bad request"}), {}, False)
+                    break
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close") \
+                    or headers.get("connection", "").lower() == "keep-alive"
+                # Request bodies are never used, but must be consumed so the next request on the
+                # connection starts at the right byte; chunked or malformed lengths end the connection
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0 or "transfer-encoding" in headers:
+                    await self._write(writer, Response(HTTPStatus.BAD_REQUEST, {"error": "Bad request"}), {}, False)
+                    break
+                while length:
+                    length -= len(await reader.readexactly(min(length, 65536)))
+                if method not in ("GET", "HEAD"):
+                    response = Response(HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Only GET is supported"})
+                else:
+                    response = self.respond(target)
+                await self._write(writer, response, headers, keep_alive, head=method == "HEAD")
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _write(self, writer, response: Response, headers: dict, keep_alive: bool, head: bool = False):
+        status = response.status
+        body = response.body
+        compress = len(body) >= GZIP_MIN_BYTES and "gzip" in headers.get("accept-encoding", "")
+        etag = response.gzip_etag if compress else response.etag
+        extra = [f"ETag: {etag}", "Cache-Control: no-cache", "Vary: Accept-Encoding"]
+        if status == HTTPStatus.OK and headers.get("if-none-match") == etag:
+            status, body = HTTPStatus.NOT_MODIFIED, b""
+        elif compress:
+            body = response.gzipped
+            extra.append("Content-Encoding: gzip")
+        head_lines = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+            *extra,
+        ]
+        writer.write(("\r\n".join(head_lines) + "\r\n\r\n").encode("latin-1"))
+        if not head:
+            writer.write(body)
+        await writer.drain()
+
+
+async def serve(db_path: Path = DB_PATH, host: str = HOST, port: int = PORT):
+    db = ExerciseDB(db_path)
+    service = QueryService(ExerciseQueries(db))
+    server = await asyncio.start_server(service.handle, host, port)
+    logger.info(f"Serving {len(db)} exercises from {db_path} on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the exercise dataset over HTTP")
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(format="%(asctime)s | %(levelname)s | %(message)s",
+                        datefmt="%Y-%m-%d %H:%M:%S", level=logging.INFO)
+    if not args.db.exists():
+        logger.error(f"{args.db} not found, run `uv run exercise_db.py build` first")
+        return 1
+    try:
+        asyncio.run(serve(args.db, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
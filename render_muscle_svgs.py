@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# /// script
+# requires-python = ">=3.9"
+# dependencies = []
+# ///
+"""
+Batch pre-rendering of muscle-highlight SVGs (and optional PNG thumbnails).
+
+Each anatomy SVG is parsed once into an index of its muscle groups (``<g>``
+elements whose id is a slug from ``svg_muscle_groups.csv``) and a minified
+template (coordinates rounded, unused ids and presentation fills dropped,
+whitespace removed). Rendering an exercise only builds a small ``<style>``
+block with one rule per active group, coloured with ``muscle_colors`` from
+``config_generated.json``, and splices it into the template.
+
+Colouring follows ``BodyVisualization.tsx``: inactive groups get the inactive
+colour at opacity 0.6 and active ones their role colour at 0.8. When a group
+is hit in several roles the strongest role wins (target > synergist >
+stabilizer > lengthening).
+
+Renders are spread over a process pool. A manifest records a hash of each
+exercise's inputs, so unchanged exercises are skipped on the next run.
+
+    uv run render_muscle_svgs.py
+    uv run --with cairosvg render_muscle_svgs.py --png
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from exercise_data import CONFIG_JSON, MUSCLE_ROLES, ROOT, load_muscle_to_svg, load_svg_groups
+from muscle_names import get_canonicalizer
+
+SVG_DIR = ROOT / "muscle-map" / "public" / "assets" / "anatomy-svgs"
+VIEWS = ("front", "back")
+OUTPUT_DIR = ROOT / "muscle-map" / "public" / "assets" / "exercises"
+MANIFEST_NAME = "manifest.json"
+
+# Bump when the template or rendering rules change, invalidates the manifest
+RENDER_VERSION = 1
+
+INACTIVE_OPACITY = "0.6"
+ACTIVE_OPACITY = "0.8"
+THUMBNAIL_WIDTH = 120
+
+SVG_NS = "http://www.w3.org/2000/svg"
+_NUMBER_RE = re.compile(r"-?\d+\.\d+")
+_URL_REF_RE = re.compile(r"url\(#([^)]+)\)")
+
+
+def _round_numbers(value: str, digits: int = 2) -> str:
+    def fmt(match):
+        text = f"{float(match.group()):.{digits}f}".rstrip("0").rstrip(".")
+        return "0" if text == "-0" else text
+    return _NUMBER_RE.sub(fmt, value)
+
+
+class SvgTemplate:
+    """
+    One anatomy view parsed into an id -> element index of its muscle groups and
+    a minified document split where the per-exercise ``<style>`` block goes.
+    """
+
+    def __init__(self, path: Path, slugs: set):
+        ET.register_namespace("", SVG_NS)
+        root = ET.parse(path).getroot()
+        self.path = Path(path)
+
+        referenced = set()
+        for element in root.iter():
+            for value in element.attrib.values():
+                referenced.update(_URL_REF_RE.findall(value))
+
+        self.index = {}
+        for element in root.iter(f"{{{SVG_NS}}}g"):
+            element_id = element.get("id")
+            if element_id in slugs and element_id not in self.index:
+                self.index[element_id] = element
+
+        for element in root.iter():
+            tag = element.tag.rsplit("}", 1)[-1]
+            if tag == "path":
+                if element.get("d"):
+                    element.set("d", _round_numbers(element.get("d")))
+                # Colours come from the stylesheet, the presentation fill is dead weight
+                element.attrib.pop("fill", None)
+            element_id = element.get("id")
+            if element_id and element_id not in self.index and element_id not in referenced:
+                del element.attrib["id"]
+            element.text = element.text.strip() if element.text else None
+            element.tail = None
+
+        text = ET.tostring(root, encoding="unicode")
+        # Stylesheet goes right after the opening <svg ...> tag
+        split = text.index(">") + 1
+        self.head, self.body = text[:split], text[split:]
+        self.digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def render(self, group_styles: dict, inactive_style: str) -> str:
+        """
+        Render with ``group_styles`` (slug -> CSS declarations). Only groups present
+        in this view get a rule; every other path falls back to ``inactive_style``.
+        """
+        by_style = {}
+        for slug, style in group_styles.items():
+            if slug in self.index:
+                by_style.setdefault(style, []).append(f"#{slug} path")
+        rules = [f"path{{{inactive_style}}}"]
+        rules.extend(f"{','.join(selectors)}{{{style}}}" for style, selectors in by_style.items())
+        return f"{self.head}<style>{''.join(rules)}</style>{self.body}"
+
+
+def exercise_groups(exercise: dict, resolve) -> dict:
+    """SVG slug -> strongest role for one config exercise"""
+    groups = {}
+    for role in MUSCLE_ROLES:
+        for muscle in exercise.get(f"{role}_muscles", []):
+            slug = resolve(muscle)
+            if slug and slug not in groups:
+                groups[slug] = role
+    return groups
+
+
+def load_render_jobs(config_path: Path = CONFIG_JSON) -> tuple:
+    """(muscle_colors, {slug: {svg group: role}}) for every exercise in the config"""
+    with Path(config_path).open("r", encoding="utf-8") as f:
+        config = json.load(f)
+    muscle_names = get_canonicalizer()
+    fallback = {name.casefold(): slug for name, slug in config.get("muscle_to_svg_id", {}).items()}
+    fallback.update(load_muscle_to_svg())
+    valid = set(load_svg_groups())
+
+    def resolve(muscle):
+        slug = muscle_names.svg_slug(muscle) or fallback.get(muscle.casefold())
+        return slug if slug in valid else None
+
+    jobs = {slug: exercise_groups(exercise, resolve) for slug, exercise in config["exercises"].items()}
+    return config["muscle_colors"], jobs
+
+
+# Per-process state for the pool workers
+_templates = None
+_options = None
+
+
+def _init_worker(slugs: set, options: dict):
+    global _templates, _options
+    _templates = {view: SvgTemplate(SVG_DIR / f"{view}-body-muscles.svg", slugs) for view in VIEWS}
+    _options = options
+
+
+def _render_batch(batch: list) -> list:
+    """Render a batch of (exercise slug, groups) and write the files; returns written paths"""
+    colors = _options["colors"]
+    output_dir = Path(_options["output_dir"])
+    inactive = f"fill:{colors['inactive']};opacity:{INACTIVE_OPACITY}"
+    written = []
+    for slug, groups in batch:
+        styles = {group: f"fill:{colors[role]};opacity:{ACTIVE_OPACITY}" for group, role in groups.items()}
+        for view, template in _templates.items():
+            svg = template.render(styles, inactive)
+            svg_path = output_dir / f"{slug}-{view}.svg"
+            svg_path.write_text(svg, encoding="utf-8")
+            written.append(svg_path.name)
+            if _options["png"]:
+                import cairosvg
+                png_path = output_dir / f"{slug}-{view}.png"
+                cairosvg.svg2png(bytestring=svg.encode("utf-8"), write_to=str(png_path),
+                                 output_width=_options["thumbnail_width"])
+                written.append(png_path.name)
+    return written
+
+
+def input_hash(groups: dict, colors: dict, template_digest: str, png: bool, thumbnail_width: int = None) -> str:
+    # The thumbnail width only matters when PNGs are written
+    png_options = [png, thumbnail_width] if png else [png]
+    payload = json.dumps([RENDER_VERSION, template_digest, colors, sorted(groups.items()), *png_options])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def render_all(output_dir: Path = OUTPUT_DIR, png: bool = False, workers: int = None,
+               force: bool = False, thumbnail_width: int = THUMBNAIL_WIDTH, only: list = None) -> dict:
+    """Render every config exercise (front + back); returns counts of rendered/skipped exercises"""
+    if png:
+        try:
+            import cairosvg  # noqa: F401
+        except ImportError:
+            raise SystemExit("PNG thumbnails need cairosvg: uv run --with cairosvg render_muscle_svgs.py --png")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    colors, jobs = load_render_jobs()
+    if only:
+        jobs = {slug: groups for slug, groups in jobs.items() if slug in only}
+
+    slugs = set(load_svg_groups())
+    # Templates are cheap to build; the digest makes the manifest track SVG edits
+    digest = hashlib.sha1("".join(
+        SvgTemplate(SVG_DIR / f"{view}-body-muscles.svg", slugs).digest for view in VIEWS
+    ).encode("utf-8")).hexdigest()
+
+    manifest_path = output_dir / MANIFEST_NAME
+    manifest = {}
+    if manifest_path.exists() and not force:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    pending = []
+    hashes = {}
+    for slug, groups in jobs.items():
+        hashes[slug] = input_hash(groups, colors, digest, png, thumbnail_width)
+        entry = manifest.get(slug)
+        if entry and entry["input"] == hashes[slug] and all((output_dir / f).exists() for f in entry["files"]):
+            continue
+        pending.append((slug, groups))
+
+    options = {"colors": colors, "output_dir": str(output_dir), "png": png, "thumbnail_width": thumbnail_width}
+    if pending:
+        workers = workers or os.cpu_count() or 1
+        size = max(1, len(pending) // (workers * 4))
+        batches = [pending[i:i + size] for i in range(0, len(pending), size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(slugs, options)) as pool:
+            for batch, files in zip(batches, pool.map(_render_batch, batches)):
+                by_slug = {}
+                for name in files:
+                    by_slug.setdefault(name.rsplit("-", 1)[0], []).append(name)
+                for slug, _ in batch:
+                    manifest[slug] = {"input": hashes[slug], "files": by_slug.get(slug, [])}
+
+    manifest_path.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8")
+    return {"rendered": len(pending), "skipped": len(jobs) - len(pending)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render muscle highlight SVGs for every exercise")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--png", action="store_true", help="Also write PNG thumbnails (needs cairosvg)")
+    parser.add_argument("--thumbnail-width", type=int, default=THUMBNAIL_WIDTH)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Ignore the manifest and re-render everything")
+    parser.add_argument("--only", nargs="*", default=None, help="Render only these exercise slugs")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    stats = render_all(args.output_dir, png=args.png, workers=args.workers, force=args.force,
+                       thumbnail_width=args.thumbnail_width, only=args.only)
+    elapsed = time.perf_counter() - started
+    print(f"Rendered {stats['rendered']} exercises, skipped {stats['skipped']} unchanged "
+          f"in {elapsed:.2f}s -> {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,6 +20,9 @@ from urllib.parse import urljoin
 from dotenv import load_dotenv
 from playwright.async_api import async_playwright, TimeoutError
 
+from description_rules import CURRENT_VERSION as DESCRIPTION_RULES_VERSION, HTML_DIR, extract_description
+from muscle_names import get_canonicalizer
+
 load_dotenv()
 
 BASE = "https://app.strength.muscleandmotion.com"
@@ -44,6 +47,9 @@ MAX_EXERCISES = None  # Examples: None for all, 10 for first 10, etc.
 # Debug mode
 DEBUG_MODE = False
 
+# Keep each exercise page's HTML in HTML_DIR to re-run description rules offline
+SAVE_PAGE_HTML = False
+
 # Set up logging
 LOG_FILE = Path("scraper.log")
 
@@ -447,43 +453,20 @@ async def extract_exercise_details(page, title, exercise_path):
     except Exception:
         pass
     
-    # Extract description - target the specific content area with exercise instructions
+    # Extract description: all paragraph texts in one round trip, filtered by the
+    # versioned rules in description_rules.py (also runnable on saved page HTML)
     description = ""
     try:
         # Wait for content to load
         await page.wait_for_timeout(1000)
         
-        # Strategy: Look for paragraphs that contain actual exercise instructions
-        # These are typically longer paragraphs with action words
-        all_paragraphs = await page.locator("p").all()
-        desc_parts = []
+        if SAVE_PAGE_HTML:
+            HTML_DIR.mkdir(exist_ok=True)
+            page_id = exercise_path.rstrip("/").rsplit("/", 1)[-1]
+            (HTML_DIR / f"{page_id}.html").write_text(await page.content(), encoding="utf-8")
         
-        for p in all_paragraphs:
-            try:
-                text = clean(await p.inner_text())
-                # Skip empty text, single characters, title duplicates
-                if (text and text != title and text != "‎" and len(text) > 20 and
-                    # Skip dialog window text and other UI elements
-                    not any(skip_phrase in text.lower() for skip_phrase in [
-                        "beginning of dialog window", "escape will cancel", "close the window",
-                        "this is a modal window", "video player is loading"
-                    ]) and
-                    # Look for actual exercise instruction content
-                    any(keyword in text.lower() for keyword in [
-                        "sit on", "stand", "lie", "hold", "grip", "start with",
-                        "press", "push", "pull", "lower", "raise", "lift",
-                        "position", "arms", "legs", "chest", "back", "repeat",
-                        "slowly", "control", "incline", "targets", "emphasis"
-                    ])):
-                    desc_parts.append(text)
-            except Exception:
-                continue
-        
-        # Join and clean up the description
-        if desc_parts:
-            description = " ".join(desc_parts)[:1000]
-        else:
-            description = ""
+        paragraphs = await page.locator("p").all_inner_texts()
+        description = extract_description(paragraphs, title)
         
     except Exception as e:
         if DEBUG_MODE:
@@ -550,6 +533,11 @@ async def extract_exercise_details(page, title, exercise_path):
     except Exception:
         pass
     
+    # Scraped names are stored as-is; names that do not resolve against muscles_mapped_pruned.csv are reported
+    muscle_names = get_canonicalizer()
+    for muscle in target_muscles + lengthening_muscles + synergist_muscles + stabilizer_muscles:
+        muscle_names.resolve(muscle)
+    
     # Infer equipment
     equipment = infer_equipment(title, description)
     
@@ -565,6 +553,17 @@ async def extract_exercise_details(page, title, exercise_path):
         "equipment": equipment,
     }
 
+def log_unresolved_muscles():
+    """Report muscle names the canonicalizer could not resolve, plus newly learned fuzzy aliases"""
+    muscle_names = get_canonicalizer()
+    for alias, muscle in sorted(muscle_names.learned.items()):
+        logger.info(f"  Fuzzy muscle match: {alias} -> {muscle}")
+    if muscle_names.unresolved:
+        logger.warning(f"{len(muscle_names.unresolved)} muscle names could not be canonicalized "
+                       f"(add spellings to muscle_aliases.csv, undrawn muscles to muscle_svg_proxies.csv):")
+        for name, count in muscle_names.unresolved.most_common():
+            logger.warning(f"  ⚠ Unresolved muscle: {name} ({count}x)")
+
 def extract_muscle_group_from_url_pattern(muscle_name, muscle_url, all_muscle_links):
     """
     Extract muscle group using URL pattern matching.
@@ -674,6 +673,7 @@ async def extract_exercise_details_main():
         logger.info(f"Processing first {MAX_EXERCISES} exercises for testing")
     else:
         logger.info(f"Found {len(exercise_links)} exercises to process")
+    logger.info(f"Description rules v{DESCRIPTION_RULES_VERSION}")
     
     async with async_playwright() as pw:
         headless = bool(EMAIL and PASSWORD)
@@ -730,6 +730,7 @@ async def extract_exercise_details_main():
                     logger.error(f"[{actual_idx}] ERROR processing {title}: {e}")
         
         logger.info(f"Completed. Full details saved to {FULL_CSV}")
+        log_unresolved_muscles()
         await browser.close()
 
 async def enrich_stretching_exercises():
@@ -818,6 +819,7 @@ async def enrich_stretching_exercises():
         # Save the final enriched data
         df.to_csv(FULL_CSV, index=False)
         logger.info(f"Enrichment complete! Updated {enriched_count} exercises in {FULL_CSV}")
+        log_unresolved_muscles()
         
         await browser.close()
 
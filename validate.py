@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+# /// script
+# requires-python = ">=3.9"
+# dependencies = []
+# ///
+"""
+Consistency checker for the exercise and muscle data.
+
+Loads every CSV (exercises, ``muscles_mapped.csv``, ``muscles_mapped_pruned.csv``,
+``svg_muscle_groups.csv``, the broad/broader group lists), the config and the
+anatomy SVG group ids once into hashed sets, then runs every check against them:
+
+    unmapped_muscles        exercise muscles missing from muscles_mapped, the pruned CSV and muscle_to_svg_id
+    viewer_unhighlighted    config muscles the viewer misses although the pruned CSV gives them an SVG group
+    no_svg_group            config muscles without any SVG group (deep muscles, never drawn)
+    bad_svg_slugs           mappings pointing at SVG groups that do not exist
+    bad_broad_groups        broad/broader groups missing from their lists
+    duplicate_paths         exercise_path used by more than one row
+    empty_roles             exercises without any muscle, or without a target muscle
+    slug_collisions         titles sharing a config slug (only the last one is kept)
+    orphan_mappings         mapping rows no exercise uses
+
+Errors make the exit code 1 (``--strict`` also fails on warnings), so the
+command can gate config generation. ``--json`` prints the full report.
+
+    uv run validate.py
+    uv run validate.py --json > validation.json
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+
+from anatomy_index import load_ts_muscle_mapping
+from exercise_data import (BROAD_GROUPS_CSV, BROADER_GROUPS_CSV, CONFIG_JSON, EXERCISES_CSV, MUSCLE_ROLES,
+                           MUSCLES_MAPPED_CSV, MUSCLES_PRUNED_CSV, SVG_GROUPS_CSV, load_csv_rows, load_exercises)
+from muscle_names import get_canonicalizer
+from render_muscle_svgs import SVG_DIR, VIEWS
+
+ERROR = "error"
+WARNING = "warning"
+
+# Severity per check; order is the report order
+CHECKS = {
+    "unmapped_muscles": ERROR,
+    "viewer_unhighlighted": ERROR,
+    "no_svg_group": WARNING,
+    "bad_svg_slugs": ERROR,
+    "bad_broad_groups": ERROR,
+    "duplicate_paths": ERROR,
+    "empty_roles": WARNING,
+    "slug_collisions": WARNING,
+    "orphan_mappings": WARNING,
+}
+
+_SVG_GROUP_ID_RE = re.compile(r'<g\b[^>]*\bid="([^"]+)"')
+_VIEWER_STRIP_RE = re.compile(r"[(),]")
+
+
+def viewer_svg_id(name: str, config_map: dict, ts_map: dict) -> str:
+    """SVG group id the viewer looks up for a muscle, mirroring ``muscleNameToId``"""
+    return config_map.get(name) or ts_map.get(name) or _VIEWER_STRIP_RE.sub("", re.sub(r"\s+", "_", name.lower()))
+
+
+class Dataset:
+    """Every source file loaded once into lists, dicts and sets keyed for the checks"""
+
+    def __init__(self):
+        self.exercises = load_exercises(EXERCISES_CSV)
+        self.mapped = load_csv_rows(MUSCLES_MAPPED_CSV)
+        self.pruned = load_csv_rows(MUSCLES_PRUNED_CSV)
+        self.svg_groups = load_csv_rows(SVG_GROUPS_CSV)
+        self.broad_groups = {row["name"] for row in load_csv_rows(BROAD_GROUPS_CSV)}
+        self.broader_groups = {row["name"] for row in load_csv_rows(BROADER_GROUPS_CSV)}
+        with CONFIG_JSON.open("r", encoding="utf-8") as f:
+            self.config = json.load(f)
+        self.muscle_to_svg = self.config.get("muscle_to_svg_id", {})
+        self.ts_mapping = load_ts_muscle_mapping()
+
+        self.svg_slugs = {row["slug"] for row in self.svg_groups}
+        self.svg_ids = {row["id"] for row in self.svg_groups}
+        self.svg_present = set()
+        for view in VIEWS:
+            self.svg_present.update(_SVG_GROUP_ID_RE.findall((SVG_DIR / f"{view}-body-muscles.svg").read_text("utf-8")))
+
+        self.mapped_names = {row["muscle"].casefold() for row in self.mapped}
+        self.pruned_names = {row["muscle"].casefold() for row in self.pruned}
+        self.config_map_names = {name.casefold() for name in self.muscle_to_svg}
+
+        # Raw muscle name -> number of exercises using it (any role)
+        self.muscle_counts = Counter()
+        for exercise in self.exercises:
+            names = set()
+            for role in MUSCLE_ROLES:
+                names.update(exercise[f"{role}_muscles"])
+            self.muscle_counts.update(names)
+        self.used_names = {name.casefold() for name in self.muscle_counts}
+
+        self.config_muscle_counts = Counter()
+        for exercise in self.config["exercises"].values():
+            names = set()
+            for role in MUSCLE_ROLES:
+                names.update(exercise.get(f"{role}_muscles", []))
+            self.config_muscle_counts.update(names)
+
+
+def check_unmapped_muscles(data: Dataset) -> list:
+    muscle_names = get_canonicalizer()
+    items = []
+    for name, count in data.muscle_counts.most_common():
+        key = name.casefold()
+        if key in data.mapped_names or key in data.pruned_names or key in data.config_map_names:
+            continue
+        items.append({"muscle": name, "exercises": count, "canonical": muscle_names.canonical(name)})
+    return items
+
+
+def _viewer_misses(data: Dataset) -> list:
+    """(name, exercise count, viewer svg id, slug the pruned CSV expects) for config muscles the viewer cannot draw"""
+    muscle_names = get_canonicalizer()
+    misses = []
+    for name, count in data.config_muscle_counts.most_common():
+        svg_id = viewer_svg_id(name, data.muscle_to_svg, data.ts_mapping)
+        if svg_id not in data.svg_present:
+            misses.append((name, count, svg_id, muscle_names.svg_slug(name)))
+    return misses
+
+
+def check_viewer_unhighlighted(data: Dataset) -> list:
+    return [{"muscle": name, "exercises": count, "svg_id": svg_id, "expected": expected}
+            for name, count, svg_id, expected in _viewer_misses(data) if expected]
+
+
+def check_no_svg_group(data: Dataset) -> list:
+    return [{"muscle": name, "exercises": count}
+            for name, count, _, expected in _viewer_misses(data) if not expected]
+
+
+def check_bad_svg_slugs(data: Dataset) -> list:
+    items = []
+    for row in data.pruned:
+        slug = row["svg_muscle_group"]
+        if slug and (slug not in data.svg_slugs or slug not in data.svg_present):
+            items.append({"source": MUSCLES_PRUNED_CSV.name, "muscle": row["muscle"], "slug": slug})
+    for row in data.mapped:
+        svg_id = row["svg_muscle_group"]
+        if svg_id and svg_id not in data.svg_ids:
+            items.append({"source": MUSCLES_MAPPED_CSV.name, "muscle": row["muscle"], "slug": svg_id})
+    for source, mapping in (("muscle_to_svg_id", data.muscle_to_svg), ("muscleMapping.ts", data.ts_mapping)):
+        for name, slug in sorted(mapping.items()):
+            if slug not in data.svg_present:
+                items.append({"source": source, "muscle": name, "slug": slug})
+    for slug in sorted(data.svg_slugs - data.svg_present):
+        items.append({"source": SVG_GROUPS_CSV.name, "muscle": None, "slug": slug})
+    return items
+
+
+def check_bad_broad_groups(data: Dataset) -> list:
+    items = []
+    for source, rows in ((MUSCLES_MAPPED_CSV.name, data.mapped), (MUSCLES_PRUNED_CSV.name, data.pruned)):
+        for row in rows:
+            broad = row.get("broad_muscle_group")
+            if broad and broad not in data.broad_groups:
+                items.append({"source": source, "muscle": row["muscle"], "column": "broad_muscle_group",
+                              "value": broad})
+            broader = row.get("broader_muscle_group")
+            if broader and broader not in data.broader_groups:
+                items.append({"source": source, "muscle": row["muscle"], "column": "broader_muscle_group",
+                              "value": broader})
+    return items
+
+
+def check_duplicate_paths(data: Dataset) -> list:
+    titles = defaultdict(list)
+    for exercise in data.exercises:
+        titles[exercise["exercise_path"]].append(exercise["title"])
+    return [{"exercise_path": path, "titles": names} for path, names in titles.items() if len(names) > 1]
+
+
+def check_empty_roles(data: Dataset) -> list:
+    items = []
+    for exercise in data.exercises:
+        roles = [role for role in MUSCLE_ROLES if exercise[f"{role}_muscles"]]
+        if not roles or "target" not in roles:
+            items.append({"exercise_path": exercise["exercise_path"], "title": exercise["title"],
+                          "problem": "no muscles" if not roles else "no target muscles"})
+    return items
+
+
+def check_slug_collisions(data: Dataset) -> list:
+    titles = defaultdict(list)
+    for exercise in data.exercises:
+        titles[exercise["slug"]].append(exercise["title"])
+    return [{"slug": slug, "titles": names} for slug, names in titles.items() if len(names) > 1]
+
+
+def check_orphan_mappings(data: Dataset) -> list:
+    items = []
+    for source, names in ((MUSCLES_MAPPED_CSV.name, [row["muscle"] for row in data.mapped]),
+                          (MUSCLES_PRUNED_CSV.name, [row["muscle"] for row in data.pruned])):
+        items.extend({"source": source, "muscle": name} for name in names if name.casefold() not in data.used_names)
+    config_names = {name for name in data.config_muscle_counts}
+    items.extend({"source": "muscle_to_svg_id", "muscle": name}
+                 for name in sorted(data.muscle_to_svg) if name not in config_names
+                 and name.casefold() not in data.used_names)
+    return items
+
+
+def validate() -> dict:
+    """Run every check; returns the machine-readable report"""
+    started = time.perf_counter()
+    data = Dataset()
+    checks = {}
+    for name, severity in CHECKS.items():
+        items = globals()[f"check_{name}"](data)
+        checks[name] = {"severity": severity, "count": len(items), "items": items}
+    return {
+        "errors": sum(c["count"] for c in checks.values() if c["severity"] == ERROR),
+        "warnings": sum(c["count"] for c in checks.values() if c["severity"] == WARNING),
+        "summary": {
+            "exercises": len(data.exercises),
+            "config_exercises": len(data.config["exercises"]),
+            "muscle_names": len(data.muscle_counts),
+            "svg_groups": len(data.svg_slugs),
+        },
+        "checks": checks,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def _describe(name: str, item: dict) -> str:
+    if name == "viewer_unhighlighted":
+        return f"{item['muscle']!r} in {item['exercises']} exercises: viewer looks up {item['svg_id']!r}, " \
+               f"expected {item['expected']!r}"
+    if name in ("unmapped_muscles", "no_svg_group"):
+        extra = f" (canonical: {item['canonical']})" if item.get("canonical") else ""
+        return f"{item['muscle']!r} in {item['exercises']} exercises{extra}"
+    if name in ("duplicate_paths", "slug_collisions"):
+        key = item.get("exercise_path") or item.get("slug")
+        return f"{key}: {', '.join(item['titles'])}"
+    if name == "empty_roles":
+        return f"{item['title']} ({item['exercise_path']}): {item['problem']}"
+    if name == "bad_broad_groups":
+        return f"{item['source']}: {item['muscle']!r} {item['column']}={item['value']!r}"
+    if name == "bad_svg_slugs":
+        return f"{item['source']}: {item['muscle']!r} -> {item['slug']!r}" if item["muscle"] else \
+            f"{item['source']}: {item['slug']!r} is in neither SVG"
+    return f"{item['source']}: {item['muscle']!r}"
+
+
+def print_report(report: dict, limit: int = 20):
+    for name, check in report["checks"].items():
+        status = "ok" if not check["count"] else f"{check['count']} {check['severity']}(s)"
+        print(f"{name:22s} {status}")
+        for item in check["items"][:limit]:
+            print(f"    {_describe(name, item)}")
+        if check["count"] > limit:
+            print(f"    ... {check['count'] - limit} more")
+    print(f"\n{report['errors']} errors, {report['warnings']} warnings ({report['elapsed_ms']} ms)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the exercise and muscle data for consistency")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    parser.add_argument("--strict", action="store_true", help="Fail on warnings as well as errors")
+    parser.add_argument("--limit", type=int, default=20, help="Items shown per check in the text report")
+    args = parser.parse_args(argv)
+
+    report = validate()
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report, args.limit)
+    failed = report["errors"] or (args.strict and report["warnings"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,421 @@
+#!/usr/bin/env python
+# /// script
+# requires-python = ">=3.10"
+# dependencies = []
+# ///
+"""
+Workout builder that picks a small set of exercises covering requested muscle groups.
+
+Every exercise is reduced to integer bitsets over the SVG muscle groups in
+``svg_muscle_groups.csv`` (bit ``id - 1``), one per role. Requested broad
+groups (``broad_muscle_groups.csv``) or broader groups
+(``broader_muscle_groups.csv``) become a required bitmask, so coverage checks
+are a handful of AND/OR operations and popcounts per candidate.
+
+Two coverage granularities are supported:
+- ``muscle``: every SVG muscle belonging to a requested group must be hit
+- ``group``: each requested group must be hit by at least one of its muscles
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+from exercise_data import (
+    BROAD_GROUPS_CSV,
+    BROADER_GROUPS_CSV,
+    MUSCLES_PRUNED_CSV,
+    load_csv_rows,
+    load_exercises,
+    load_muscle_to_svg,
+    load_svg_groups,
+)
+from muscle_names import get_canonicalizer
+
+# Nothing in the dataset records duration, so every exercise takes one slot
+MINUTES_PER_EXERCISE = 8
+
+# Credit given when a muscle is only hit as a synergist (targets always count 1.0).
+# Zero means synergist hits do not count as coverage unless enabled per group.
+DEFAULT_SYNERGIST_WEIGHT = 0.0
+
+# Branch-and-bound gives up and keeps the best plan found after this many nodes
+MAX_SEARCH_NODES = 200_000
+
+# Default weekly split over the broad groups
+DEFAULT_WEEK = {
+    "Monday": ["chest", "shoulders", "triceps"],
+    "Tuesday": ["lats", "upper_back", "biceps"],
+    "Wednesday": ["quadriceps", "hamstrings", "glutes", "calves"],
+    "Thursday": ["abs", "lower_back"],
+    "Friday": ["chest", "lats", "shoulders", "biceps", "triceps"],
+    "Saturday": ["quadriceps", "hamstrings", "glutes", "abs"],
+}
+
+WEEK_JSON = Path("weekly_program.json")
+
+
+def popcount(mask: int) -> int:
+    return mask.bit_count()
+
+
+def iter_bits(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class MuscleCoverage:
+    """Bitset representation of the exercise catalogue and the muscle group hierarchy"""
+
+    def __init__(self, exercises: list = None):
+        self.exercises = exercises if exercises is not None else load_exercises()
+        self.svg_ids = load_svg_groups()
+        self.svg_slugs = {svg_id - 1: slug for slug, svg_id in self.svg_ids.items()}
+        self.muscle_names = get_canonicalizer()
+        muscle_to_svg = load_muscle_to_svg()
+
+        # Group name -> mask of SVG muscles, for both group levels
+        self.group_masks = {}
+        for row in load_csv_rows(MUSCLES_PRUNED_CSV):
+            bit = self.svg_ids.get(row["svg_muscle_group"])
+            if bit is None:
+                continue
+            for column in ("broad_muscle_group", "broader_muscle_group"):
+                if row[column]:
+                    self.group_masks[row[column]] = self.group_masks.get(row[column], 0) | (1 << (bit - 1))
+        self.broad_groups = [row["name"] for row in load_csv_rows(BROAD_GROUPS_CSV)]
+        self.broader_groups = [row["name"] for row in load_csv_rows(BROADER_GROUPS_CSV)]
+
+        self.target_bits = []
+        self.synergist_bits = []
+        for exercise in self.exercises:
+            self.target_bits.append(self._mask(exercise["target_muscles"], muscle_to_svg))
+            self.synergist_bits.append(self._mask(exercise["synergist_muscles"], muscle_to_svg))
+
+    def _mask(self, muscles: list, muscle_to_svg: dict) -> int:
+        mask = 0
+        for muscle in muscles:
+            slug = self.muscle_names.svg_slug(muscle) or muscle_to_svg.get(muscle.casefold())
+            if slug in self.svg_ids:
+                mask |= 1 << (self.svg_ids[slug] - 1)
+        return mask
+
+    def group_mask(self, group: str) -> int:
+        if group not in self.group_masks:
+            known = ", ".join(sorted(self.group_masks))
+            raise KeyError(f"Unknown muscle group '{group}'. Known groups: {known}")
+        return self.group_masks[group]
+
+    def describe(self, mask: int) -> list:
+        return [self.svg_slugs[bit] for bit in iter_bits(mask)]
+
+
+class WorkoutBuilder:
+    """Greedy and branch-and-bound set cover over the exercise bitsets"""
+
+    def __init__(self, coverage: MuscleCoverage = None):
+        self.coverage = coverage or MuscleCoverage()
+
+    def _candidates(self, groups: list, equipment, synergist_weights: dict, granularity: str, exclude):
+        """
+        Reduce the catalogue to candidates that hit at least one required bit.
+        Returns (required mask, group masks, candidates as (index, cover, target, synergist)).
+        In ``group`` granularity the masks are over group positions instead of SVG ids.
+        """
+        cov = self.coverage
+        group_masks = [cov.group_mask(g) for g in groups]
+        # Synergists only count towards groups with a non-zero synergist weight
+        synergist_allowed = 0
+        for group, mask in zip(groups, group_masks):
+            if synergist_weights.get(group, DEFAULT_SYNERGIST_WEIGHT) > 0:
+                synergist_allowed |= mask
+
+        available = frozenset(equipment) if equipment is not None else None
+        exclude = set(exclude or ())
+
+        if granularity == "muscle":
+            required = 0
+            for mask in group_masks:
+                required |= mask
+        elif granularity == "group":
+            required = (1 << len(groups)) - 1
+        else:
+            raise ValueError(f"Unknown granularity '{granularity}', expected 'muscle' or 'group'")
+
+        candidates = []
+        for i, exercise in enumerate(cov.exercises):
+            if i in exclude or exercise["exercise_path"] in exclude:
+                continue
+            if available is not None and not frozenset(exercise["equipment"]) <= available:
+                continue
+            target = cov.target_bits[i]
+            synergist = cov.synergist_bits[i] & synergist_allowed & ~target
+            if granularity == "group":
+                target = sum(1 << g for g, mask in enumerate(group_masks) if target & mask)
+                synergist = sum(1 << g for g, mask in enumerate(group_masks) if synergist & mask) & ~target
+            target &= required
+            synergist &= required
+            if target | synergist:
+                candidates.append((i, target | synergist, target, synergist))
+        return required, group_masks, candidates
+
+    def _weight_masks(self, groups: list, group_masks: list, synergist_weights: dict, granularity: str) -> list:
+        """(mask, weight) pairs used to score synergist-only coverage"""
+        pairs = []
+        for position, (group, mask) in enumerate(zip(groups, group_masks)):
+            weight = synergist_weights.get(group, DEFAULT_SYNERGIST_WEIGHT)
+            pairs.append((1 << position if granularity == "group" else mask, weight))
+        return pairs
+
+    @staticmethod
+    def _gain(target: int, synergist: int, uncovered: int, weight_masks: list) -> float:
+        gain = popcount(target & uncovered)
+        synergist &= uncovered
+        if synergist:
+            for mask, weight in weight_masks:
+                if synergist & mask:
+                    gain += weight * popcount(synergist & mask)
+                    synergist &= ~mask
+        return gain
+
+    def greedy(self, required: int, candidates: list, weight_masks: list, max_exercises: int = None) -> list:
+        """Classic greedy set cover, stops when covered or when the slot budget runs out"""
+        uncovered = required
+        chosen = []
+        remaining = list(candidates)
+        while uncovered and remaining and (max_exercises is None or len(chosen) < max_exercises):
+            best = max(remaining, key=lambda c: self._gain(c[2], c[3], uncovered, weight_masks))
+            if not best[1] & uncovered:
+                break
+            chosen.append(best)
+            uncovered &= ~best[1]
+            remaining.remove(best)
+        return chosen
+
+    def branch_and_bound(self, required: int, candidates: list, incumbent: list,
+                         max_nodes: int = MAX_SEARCH_NODES) -> tuple:
+        """
+        Exact minimum set cover seeded with a greedy incumbent.
+        Branches on the uncovered bit with the fewest covering candidates and prunes
+        with ``depth + ceil(uncovered / largest cover)``. Returns (plan, optimal).
+        """
+        # Keep one candidate per distinct cover and drop covers dominated by another
+        by_cover = {}
+        for candidate in candidates:
+            current = by_cover.get(candidate[1])
+            if current is None or popcount(candidate[2]) > popcount(current[2]):
+                by_cover[candidate[1]] = candidate
+        covers = sorted(by_cover.values(), key=lambda c: -popcount(c[1]))
+        covers = [c for c in covers if not any(o[1] != c[1] and c[1] & o[1] == c[1] for o in covers)]
+        largest = popcount(covers[0][1]) if covers else 1
+
+        covering = {bit: [c for c in covers if c[1] >> bit & 1] for bit in iter_bits(required)}
+        best = list(incumbent)
+        nodes = 0
+        exhausted = False
+
+        def search(uncovered: int, chosen: list):
+            nonlocal best, nodes, exhausted
+            if not uncovered:
+                if len(chosen) < len(best):
+                    best = list(chosen)
+                return
+            nodes += 1
+            if nodes > max_nodes:
+                exhausted = True
+                return
+            if len(chosen) + math.ceil(popcount(uncovered) / largest) >= len(best):
+                return
+            bit = min(iter_bits(uncovered), key=lambda b: len(covering[b]))
+            for candidate in covering[bit]:
+                chosen.append(candidate)
+                search(uncovered & ~candidate[1], chosen)
+                chosen.pop()
+                if exhausted:
+                    return
+
+        search(required, [])
+        return best, not exhausted
+
+    def build(self, groups: list, equipment=None, synergist_weights: dict = None,
+              time_budget: int = None, granularity: str = "muscle", exact: bool = True,
+              exclude=None) -> dict:
+        """
+        Build one workout.
+        ``equipment`` is the set of available equipment (None means anything),
+        ``synergist_weights`` maps group -> credit for synergist-only hits (0 disables),
+        ``time_budget`` in minutes caps the number of exercises.
+        """
+        synergist_weights = synergist_weights or {}
+        started = time.perf_counter()
+        required, group_masks, candidates = self._candidates(
+            groups, equipment, synergist_weights, granularity, exclude)
+        weight_masks = self._weight_masks(groups, group_masks, synergist_weights, granularity)
+
+        # Bits nobody can cover (e.g. no candidate hits gracilis) are dropped up front
+        reachable = 0
+        for candidate in candidates:
+            reachable |= candidate[1]
+        uncoverable = required & ~reachable
+        required &= reachable
+
+        max_exercises = time_budget // MINUTES_PER_EXERCISE if time_budget else None
+        plan = self.greedy(required, candidates, weight_masks, max_exercises)
+        optimal = False
+        covered = 0
+        for candidate in plan:
+            covered |= candidate[1]
+        if exact and covered == required and len(plan) > 1:
+            plan, optimal = self.branch_and_bound(required, candidates, plan)
+
+        covered = 0
+        for candidate in plan:
+            covered |= candidate[1]
+        if granularity == "group":
+            names = lambda mask: [groups[bit] for bit in iter_bits(mask)]
+        else:
+            names = self.coverage.describe
+
+        exercises = self.coverage.exercises
+        return {
+            "groups": groups,
+            "granularity": granularity,
+            "exercises": [
+                {
+                    "title": exercises[i]["title"],
+                    "exercise_path": exercises[i]["exercise_path"],
+                    "equipment": exercises[i]["equipment"],
+                    "targets": names(target),
+                    "synergists": names(synergist),
+                }
+                for i, _, target, synergist in plan
+            ],
+            "covered": names(covered),
+            "missing": names(required & ~covered),
+            "uncoverable": names(uncoverable),
+            "minutes": len(plan) * MINUTES_PER_EXERCISE,
+            "optimal": optimal,
+            "candidates": len(candidates),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def build_week(self, split: dict = DEFAULT_WEEK, vary: bool = True, **options) -> dict:
+        """Build one workout per day; with ``vary`` an exercise is used at most once per week"""
+        used = set(options.pop("exclude", None) or ())
+        program = {}
+        for day, groups in split.items():
+            workout = self.build(groups, exclude=used if vary else None, **options)
+            if vary:
+                used.update(e["exercise_path"] for e in workout["exercises"])
+            program[day] = workout
+        return program
+
+
+def print_workout(title: str, workout: dict):
+    print(f"=== {title}: {', '.join(workout['groups'])} "
+          f"({len(workout['exercises'])} exercises, ~{workout['minutes']} min, "
+          f"{workout['candidates']} candidates, {workout['elapsed_ms']} ms"
+          f"{', optimal' if workout['optimal'] else ''})")
+    for exercise in workout["exercises"]:
+        equipment = ", ".join(exercise["equipment"]) or "-"
+        hits = ", ".join(exercise["targets"])
+        if exercise["synergists"]:
+            hits += f" (synergist: {', '.join(exercise['synergists'])})"
+        print(f"  - {exercise['title']} [{equipment}] -> {hits}")
+    if workout["missing"]:
+        print(f"  Not covered (time budget): {', '.join(workout['missing'])}")
+    if workout["uncoverable"]:
+        print(f"  Not coverable by any candidate: {', '.join(workout['uncoverable'])}")
+
+
+def parse_weights(values: list, known_groups) -> dict:
+    """``GROUP=WEIGHT`` arguments -> {group: weight}; raises ValueError on malformed values or unknown groups"""
+    weights = {}
+    for value in values or []:
+        group, sep, weight = value.partition("=")
+        if not sep or not group:
+            raise ValueError(f"--synergist-weight expects GROUP=WEIGHT, got '{value}'")
+        if group not in known_groups:
+            raise ValueError(f"Unknown muscle group '{group}' in --synergist-weight. "
+                             f"Known groups: {', '.join(sorted(known_groups))}")
+        try:
+            weights[group] = float(weight)
+        except ValueError:
+            raise ValueError(f"--synergist-weight {group}: '{weight}' is not a number")
+        if not weights[group] >= 0:
+            raise ValueError(f"--synergist-weight {group}: weight must be 0 or more, got '{weight}'")
+    return weights
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build workouts covering muscle groups")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(p):
+        p.add_argument("--equipment", nargs="*", default=None,
+                       help="Available equipment, e.g. --equipment Dumbbell Bench")
+        p.add_argument("--minutes", type=int, default=None, help="Time budget per workout")
+        p.add_argument("--granularity", choices=("muscle", "group"), default="muscle")
+        p.add_argument("--synergist-weight", nargs="*", default=None, metavar="GROUP=WEIGHT",
+                       help="Credit for synergist-only hits per group, 0 to require targets")
+        p.add_argument("--greedy", action="store_true", help="Skip the exact branch-and-bound search")
+
+    workout = sub.add_parser("workout", help="Build a single workout")
+    workout.add_argument("groups", nargs="+", help="Broad or broader muscle groups, e.g. chest triceps")
+    add_common(workout)
+
+    week = sub.add_parser("week", help="Build a weekly program")
+    week.add_argument("--split", type=Path, default=None,
+                      help="JSON file mapping day -> list of groups (default: built-in split)")
+    week.add_argument("--output", type=Path, default=WEEK_JSON)
+    add_common(week)
+
+    sub.add_parser("groups", help="List the available muscle groups")
+
+    args = parser.parse_args(argv)
+    builder = WorkoutBuilder()
+
+    if args.command == "groups":
+        print("Broad groups:   " + ", ".join(builder.coverage.broad_groups))
+        print("Broader groups: " + ", ".join(builder.coverage.broader_groups))
+        return 0
+
+    try:
+        synergist_weights = parse_weights(args.synergist_weight, builder.coverage.group_masks)
+    except ValueError as e:
+        parser.error(str(e))
+
+    options = {
+        "equipment": args.equipment,
+        "time_budget": args.minutes,
+        "granularity": args.granularity,
+        "synergist_weights": synergist_weights,
+        "exact": not args.greedy,
+    }
+    try:
+        if args.command == "workout":
+            print_workout("Workout", builder.build(args.groups, **options))
+        else:
+            split = DEFAULT_WEEK
+            if args.split:
+                with args.split.open("r", encoding="utf-8") as f:
+                    split = json.load(f)
+            program = builder.build_week(split, **options)
+            for day, day_workout in program.items():
+                print_workout(day, day_workout)
+            with args.output.open("w", encoding="utf-8") as f:
+                json.dump(program, f, indent=2, ensure_ascii=False)
+            print(f"Saved weekly program to {args.output}")
+    except KeyError as e:
+        print(e.args[0], file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())